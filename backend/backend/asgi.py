@@ -0,0 +1,35 @@
+import os
+
+import django
+from django.core.handlers.asgi import ASGIHandler
+
+os.environ['DJANGO_SETTINGS_MODULE'] = 'backend.settings'
+
+ASYNC_URLCONF = 'recipes.async_urls'
+EVENTS_PATH = '/api/events/'
+
+
+class AsyncRoutesHandler(ASGIHandler):
+    """Resolve ASGI requests against ``ASYNC_URLCONF``.
+
+    WSGI keeps ``ROOT_URLCONF`` and the plain sync views.
+    """
+
+    def create_request(self, scope, body_file):
+        request, error_response = super().create_request(scope, body_file)
+        if request is not None:
+            request.urlconf = ASYNC_URLCONF
+        return request, error_response
+
+
+django.setup(set_prefix=False)
+django_application = AsyncRoutesHandler()
+
+from recipes.streams import events_app  # noqa: E402
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'http' and scope['path'] == EVENTS_PATH:
+        await events_app(scope, receive, send)
+    else:
+        await django_application(scope, receive, send)
@@ -1,6 +1,103 @@
-from rest_framework.pagination import PageNumberPagination
+import json
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator that caches ``count`` under a key supplied by the view.
+
+    With ``estimated`` set, PostgreSQL planner estimates are used instead
+    of running ``COUNT(*)``; other databases fall back to the exact count.
+    """
+
+    def __init__(self, object_list, per_page, count_key=None,
+                 estimated=False, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_key = count_key
+        self.estimated = estimated
+
+    def estimate_count(self):
+        connection = connections[self.object_list.db]
+        if connection.vendor != 'postgresql':
+            return None
+        sql, params = self.object_list.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+
+    @cached_property
+    def count(self):
+        if self.count_key is None:
+            return super().count
+        count = cache.get(self.count_key)
+        if count is None:
+            if self.estimated:
+                count = self.estimate_count()
+            if count is None:
+                count = super().count
+            cache.set(self.count_key, count,
+                      settings.PAGINATION_COUNT_CACHE_TIMEOUT)
+        return count
 
 
 class LimitPageNumberPagination(PageNumberPagination):
     page_size_query_param = 'limit'
     page_size = 6
+
+    def paginate_queryset(self, queryset, request, view=None):
+        get_count_cache_key = getattr(view, 'get_count_cache_key', None)
+        if get_count_cache_key is not None:
+            self.django_paginator_class = partial(
+                CachedCountPaginator,
+                count_key=get_count_cache_key(),
+                estimated=request.query_params.get('count') == 'estimated',
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+
+class LimitCursorPagination(CursorPagination):
+    page_size_query_param = 'limit'
+    page_size = 6
+    ordering = '-id'
+
+
+class FeedCursorPagination(LimitCursorPagination):
+    ordering = '-recipe_id'
+
+
+class SyncCursorPagination(LimitCursorPagination):
+    ordering = ('modified', 'id')
+
+
+class CursorPaginationMixin:
+    """Switch a view to keyset pagination with ``?paginate=cursor``.
+
+    Cursor pages never run OFFSET or COUNT queries; the ``next`` and
+    ``previous`` links keep the query string, so the mode sticks. Views
+    with their own sort orders override ``get_cursor_ordering``.
+    """
+    cursor_pagination_class = LimitCursorPagination
+
+    def get_cursor_ordering(self):
+        return self.cursor_pagination_class.ordering
+
+    def use_cursor_pagination(self):
+        params = self.request.query_params
+        return (params.get('paginate') == 'cursor'
+                or self.cursor_pagination_class.cursor_query_param in params)
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator') and self.use_cursor_pagination():
+            self._paginator = self.cursor_pagination_class()
+            self._paginator.ordering = self.get_cursor_ordering()
+        return super().paginator
@@ -1,4 +1,5 @@
 import os
+from datetime import datetime, timezone
 
 from dotenv import load_dotenv
 
@@ -64,6 +65,8 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'backend.wsgi.application'
 
+ASGI_APPLICATION = 'backend.asgi.application'
+
 
 if DEBUG:
     DATABASES = {
@@ -119,6 +122,40 @@ MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'CACHE_BACKEND',
+            default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', default=''),
+    }
+}
+
+SHOPPING_LIST_CACHE_TIMEOUT = 60 * 60
+
+CATALOG_VERSION_TTL = 5
+
+PAGINATION_COUNT_CACHE_TIMEOUT = 60
+
+RECIPE_FRAGMENT_CACHE_TIMEOUT = 60
+
+POPULARITY_HALF_LIFE = 7 * 24 * 60 * 60
+
+POPULARITY_EPOCH = datetime(2022, 1, 1, tzinfo=timezone.utc)
+
+EVENTS_BROKER = os.environ.get(
+    'EVENTS_BROKER', default='recipes.events.InMemoryBroker')
+
+EVENTS_QUEUE_SIZE = 100
+
+EVENTS_HEARTBEAT_INTERVAL = 15
+
+EVENTS_TICKET_MAX_AGE = 60
+
+PDF_FONT_PATH = os.environ.get(
+    'PDF_FONT_PATH',
+    default='/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf')
+
 AUTH_USER_MODEL = 'users.User'
 
 REST_FRAMEWORK = {
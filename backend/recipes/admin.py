@@ -1,5 +1,6 @@
 from django.contrib.admin import ModelAdmin, register
 
+from . import shopping_lists, versions
 from .models import CountOfIngredient, Favorite, Ingredient, Recipe, Tag
 
 
@@ -17,12 +18,10 @@ class TagAdmin(ModelAdmin):
 
 @register(Recipe)
 class RecipeAdmin(ModelAdmin):
-    list_display = ('name', 'author', 'added_in_favorites')
+    list_display = ('name', 'author', 'favorites_count', 'in_carts_count',
+                    'popularity')
     list_filter = ('name', 'author', 'tags',)
-    readonly_fields = ('added_in_favorites',)
-
-    def added_in_favorites(self, obj):
-        return obj.favorites.count()
+    readonly_fields = ('favorites_count', 'in_carts_count', 'popularity')
 
 
 @register(CountOfIngredient)
@@ -31,8 +30,32 @@ class CountOfIngredientAdmin(ModelAdmin):
         'id', 'recipe', 'ingredient', 'amount'
     )
 
+    @staticmethod
+    def change_shopping_lists(obj, sign):
+        shopping_lists.update_recipe(
+            obj.recipe_id, {obj.ingredient_id: sign * obj.amount})
+
+    def save_model(self, request, obj, form, change):
+        if change:
+            self.change_shopping_lists(
+                CountOfIngredient.objects.get(pk=obj.pk), -1)
+        super().save_model(request, obj, form, change)
+        self.change_shopping_lists(obj, 1)
+        versions.recipe_ingredients.bump_on_commit()
+
+    def delete_model(self, request, obj):
+        self.change_shopping_lists(obj, -1)
+        super().delete_model(request, obj)
+        versions.recipe_ingredients.bump_on_commit()
+
+    def delete_queryset(self, request, queryset):
+        for obj in queryset:
+            self.change_shopping_lists(obj, -1)
+        super().delete_queryset(request, queryset)
+        versions.recipe_ingredients.bump_on_commit()
+
 
 @register(Favorite)
 class FavoriteAdmin(ModelAdmin):
-    list_display = ('user', 'recipe',)
+    list_display = ('user', 'recipe', 'created')
     list_filter = ('user', 'recipe',)
@@ -0,0 +1,21 @@
+"""URLconf of ASGI requests: async router routes in front of the root one.
+
+The whole router goes first, so its routes keep their relative order.
+"""
+from django.urls import include, path
+
+from backend import urls as root_urls
+
+from .async_views import make_async
+from .urls import router
+
+ASYNC_ROUTES = (
+    'recipes-list', 'recipes-detail',
+    'ingredients-list', 'ingredients-detail',
+    'tags-list', 'tags-detail',
+)
+
+urlpatterns = [
+    path('api/', include(make_async(router.urls, ASYNC_ROUTES))),
+    *root_urls.urlpatterns,
+]
@@ -0,0 +1,47 @@
+from functools import partial, wraps
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+from django.urls import re_path
+from rest_framework.permissions import SAFE_METHODS
+
+
+def call_view(view, request, *args, **kwargs):
+    close_old_connections()
+    try:
+        response = view(request, *args, **kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+        return response
+    finally:
+        close_old_connections()
+
+
+def async_view(view):
+    """Serve a sync view from an async one.
+
+    Read requests run in the shared thread pool (``thread_sensitive=False``)
+    together with response rendering, so the event loop is never blocked by
+    ORM or serializer work and slow reads do not queue behind each other.
+    Writes keep Django's thread-sensitive execution.
+    """
+    run_read = sync_to_async(partial(call_view, view), thread_sensitive=False)
+    run_write = sync_to_async(partial(call_view, view))
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method in SAFE_METHODS:
+            return await run_read(request, *args, **kwargs)
+        return await run_write(request, *args, **kwargs)
+
+    return wrapper
+
+
+def make_async(urlpatterns, names):
+    """Wrap the views of the named URL patterns with ``async_view``."""
+    return [
+        re_path(pattern.pattern.regex.pattern, async_view(pattern.callback),
+                pattern.default_args, pattern.name)
+        if pattern.name in names else pattern
+        for pattern in urlpatterns
+    ]
@@ -0,0 +1,73 @@
+import gzip
+import re
+import threading
+
+from django.http import HttpResponse
+from django.utils.cache import (get_conditional_response,
+                                patch_cache_control, patch_vary_headers)
+from django.utils.http import http_date
+from rest_framework.renderers import JSONRenderer
+
+from .models import Ingredient, Tag
+from .serializers import IngredientSerializer, TagSerializer
+from .versions import Version
+
+ACCEPTS_GZIP = re.compile(r'\bgzip\b')
+
+
+class Catalog(Version):
+    """Versioned, pre-serialized copy of a rarely changing model table.
+
+    Each process keeps the JSON body (plain and gzipped) of the version it
+    saw last.
+    """
+
+    def __init__(self, name, model, serializer_class):
+        super().__init__(name)
+        self.model = model
+        self.serializer_class = serializer_class
+        self._lock = threading.Lock()
+        self._body = None
+
+    def build(self, version, modified):
+        data = self.serializer_class(
+            self.model.objects.all(), many=True).data
+        content = JSONRenderer().render(data)
+        return version, modified, data, content, gzip.compress(content)
+
+    def get_body(self):
+        version, modified = self.get_version()
+        body = self._body
+        if body is None or body[0] != version:
+            with self._lock:
+                body = self._body
+                if body is None or body[0] != version:
+                    body = self.build(version, modified)
+                    self._body = body
+        return body
+
+    def get_data(self):
+        return self.get_body()[2]
+
+    def get_response(self, request):
+        version, modified, _, content, compressed = self.get_body()
+        etag = f'"{self.name}-{version}"'
+        if ACCEPTS_GZIP.search(request.META.get('HTTP_ACCEPT_ENCODING', '')):
+            etag = f'"{self.name}-{version}-gzip"'
+            content = compressed
+        last_modified = int(modified.timestamp())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = HttpResponse(content, content_type='application/json')
+            if content is compressed:
+                response['Content-Encoding'] = 'gzip'
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        patch_vary_headers(response, ('Accept-Encoding',))
+        patch_cache_control(response, no_cache=True)
+        return response
+
+
+ingredients = Catalog('ingredients', Ingredient, IngredientSerializer)
+tags = Catalog('tags', Tag, TagSerializer)
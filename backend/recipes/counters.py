@@ -0,0 +1,43 @@
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Favorite, Recipe, ShoppingCart, User
+
+COUNTER_FIELDS = {
+    Favorite: 'favorites_count',
+    ShoppingCart: 'in_carts_count',
+}
+
+
+def shift(field, delta):
+    """Counters never go below zero, even if they drifted before."""
+    return Greatest(F(field) + delta, Value(0))
+
+
+def change(model, recipe_ids, delta):
+    if recipe_ids:
+        field = COUNTER_FIELDS[model]
+        Recipe.objects.filter(id__in=recipe_ids).update(
+            **{field: shift(field, delta)})
+
+
+def change_recipes_count(author_id, delta):
+    User.objects.filter(id=author_id).update(
+        recipes_count=shift('recipes_count', delta))
+
+
+def count_by(model, field):
+    return Coalesce(Subquery(
+        model.objects.filter(**{field: OuterRef('pk')}).order_by().values(
+            field).annotate(total=Count('pk')).values('total')
+    ), Value(0))
+
+
+@transaction.atomic
+def reconcile():
+    Recipe.objects.update(**{
+        field: count_by(model, 'recipe')
+        for model, field in COUNTER_FIELDS.items()
+    })
+    User.objects.update(recipes_count=count_by(Recipe, 'author'))
@@ -0,0 +1,54 @@
+import time
+from hashlib import md5
+
+from django.core.cache import cache
+from django.db import transaction
+
+GENERATION_KEY = 'recipe_count_generation'
+USER_GENERATION_KEY = 'recipe_count_generation:{user_id}'
+IGNORED_PARAMS = ('page', 'limit', 'count', 'paginate', 'cursor', 'format')
+USER_FILTERS = ('is_favorited', 'is_in_shopping_cart')
+
+
+def get_generation(key):
+    return cache.get_or_set(key, time.time_ns, None)
+
+
+def bump_generation(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+def bump_generation_on_commit(key):
+    """Bump once the transaction commits.
+
+    Bumping earlier would let a concurrent request cache a count of the
+    pre-commit rows under the new generation.
+    """
+    transaction.on_commit(lambda: bump_generation(key))
+
+
+def invalidate():
+    bump_generation_on_commit(GENERATION_KEY)
+
+
+def invalidate_user(user):
+    bump_generation_on_commit(USER_GENERATION_KEY.format(user_id=user.id))
+
+
+def get_cache_key(request):
+    """Cache key of a recipe count for the normalized filter set."""
+    params = request.query_params
+    filters = sorted(
+        (name, sorted(params.getlist(name)))
+        for name in params if name not in IGNORED_PARAMS
+    )
+    scope = [get_generation(GENERATION_KEY), params.get('count')]
+    if (request.user.is_authenticated
+            and any(name in params for name in USER_FILTERS)):
+        scope += [request.user.id, get_generation(
+            USER_GENERATION_KEY.format(user_id=request.user.id))]
+    digest = md5(repr((scope, filters)).encode()).hexdigest()
+    return f'recipe_count:{digest}'
@@ -0,0 +1,67 @@
+import asyncio
+import threading
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+
+class InMemoryBroker:
+    """Process-local event broker.
+
+    Subscribers are asyncio queues owned by the event loop that serves the
+    stream; ``publish`` may be called from any thread. Events only reach
+    streams served by the same process, so deployments with several worker
+    processes need a broker with the same interface backed by a shared
+    message bus.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}
+
+    def subscribe(self, user_id):
+        queue = asyncio.Queue(settings.EVENTS_QUEUE_SIZE)
+        subscriber = (asyncio.get_running_loop(), queue)
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, user_id, subscriber):
+        with self._lock:
+            subscribers = self._subscribers.get(user_id, set())
+            subscribers.discard(subscriber)
+            if not subscribers:
+                self._subscribers.pop(user_id, None)
+
+    @staticmethod
+    def deliver(queue, event):
+        if not queue.full():
+            queue.put_nowait(event)
+
+    def publish(self, user_ids, event):
+        with self._lock:
+            subscribers = [
+                subscriber
+                for user_id in user_ids
+                for subscriber in self._subscribers.get(user_id, ())
+            ]
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self.deliver, queue, event)
+            except RuntimeError:
+                pass
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    return import_string(settings.EVENTS_BROKER)()
+
+
+def publish(user_ids, event_type, data):
+    """Send an event to the streams of users once the transaction commits."""
+    user_ids = list(user_ids)
+    if user_ids:
+        transaction.on_commit(lambda: get_broker().publish(
+            user_ids, {'type': event_type, 'data': data}))
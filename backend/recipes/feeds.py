@@ -0,0 +1,26 @@
+from .models import FeedEntry, Recipe
+
+BATCH_SIZE = 1000
+
+
+def add_recipe(recipe, follower_ids):
+    FeedEntry.objects.bulk_create(
+        (FeedEntry(user_id=user_id, recipe=recipe, author_id=recipe.author_id)
+         for user_id in follower_ids),
+        batch_size=BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def follow(user_id, author_id):
+    FeedEntry.objects.bulk_create(
+        (FeedEntry(user_id=user_id, recipe_id=recipe_id, author_id=author_id)
+         for recipe_id in Recipe.objects.filter(
+            author_id=author_id).values_list('id', flat=True).iterator()),
+        batch_size=BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def unfollow(user_id, author_id):
+    FeedEntry.objects.filter(user_id=user_id, author_id=author_id).delete()
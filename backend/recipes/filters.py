@@ -1,29 +1,89 @@
+from django import forms
+from django.db.models import Exists, OuterRef
 from django_filters.rest_framework import FilterSet, filters
-from rest_framework.filters import SearchFilter
 
-from .models import Recipe
+from . import catalogs
+from .models import CountOfIngredient, Recipe
+from .search import recipe_ingredient_index
+
+
+def get_tag_choices():
+    return [(tag['slug'], tag['name']) for tag in catalogs.tags.get_data()]
+
+
+# Longer id lists from the in-memory index are replaced by subqueries: SQLite
+# limits the number of query parameters and huge IN lists are slow anyway.
+MAX_RECIPE_IDS = 500
+
+ORDERING_FIELDS = {
+    'popular': '-popularity',
+    'favorites': '-favorites_count',
+}
+
+
+class IntegerInFilter(filters.BaseInFilter, filters.Filter):
+    field_class = forms.IntegerField
 
 
 class RecipeFilter(FilterSet):
     is_in_shopping_cart = filters.BooleanFilter(
         method='get_is_in_shopping_cart')
     is_favorited = filters.BooleanFilter(method='get_is_favorited')
-    tags = filters.AllValuesMultipleFilter(field_name='tags__slug')
+    tags = filters.MultipleChoiceFilter(
+        choices=get_tag_choices, method='get_tags')
+    ingredients = IntegerInFilter(method='get_ingredients')
+    exclude_ingredients = IntegerInFilter(method='get_exclude_ingredients')
+    ordering = filters.ChoiceFilter(
+        choices=(('popular', 'popular'), ('favorites', 'favorites')),
+        method='get_ordering')
 
     class Meta:
         model = Recipe
-        fields = ('tags', 'author', 'is_favorited', 'is_in_shopping_cart')
+        fields = ('tags', 'author', 'is_favorited', 'is_in_shopping_cart',
+                  'ingredients', 'exclude_ingredients', 'ordering')
 
     def get_is_in_shopping_cart(self, queryset, name, value):
         if value:
-            return queryset.filter(shopping_cart__user=self.request.user)
+            return queryset.filter(is_in_shopping_cart=True)
         return queryset
 
     def get_is_favorited(self, queryset, name, value):
         if value:
-            return queryset.filter(favorites__user=self.request.user)
+            return queryset.filter(is_favorited=True)
+        return queryset
+
+    def get_tags(self, queryset, name, value):
+        tag_ids = [
+            tag['id'] for tag in catalogs.tags.get_data()
+            if tag['slug'] in value
+        ]
+        return queryset.filter(Exists(Recipe.tags.through.objects.filter(
+            recipe=OuterRef('pk'), tag_id__in=tag_ids)))
+
+    @staticmethod
+    def has_ingredients(ingredient_ids):
+        return Exists(CountOfIngredient.objects.filter(
+            recipe=OuterRef('pk'), ingredient_id__in=ingredient_ids))
+
+    def get_ingredients(self, queryset, name, value):
+        exclude_ids = self.form.cleaned_data.get('exclude_ingredients')
+        recipe_ids = recipe_ingredient_index.contains_all(
+            value, exclude_ids or ())
+        if len(recipe_ids) <= MAX_RECIPE_IDS:
+            return queryset.filter(id__in=recipe_ids)
+        for ingredient_id in set(value):
+            queryset = queryset.filter(self.has_ingredients([ingredient_id]))
+        if exclude_ids:
+            queryset = queryset.filter(~self.has_ingredients(exclude_ids))
         return queryset
 
+    def get_exclude_ingredients(self, queryset, name, value):
+        if self.form.cleaned_data.get('ingredients'):
+            return queryset
+        recipe_ids = recipe_ingredient_index.contains_any(value)
+        if len(recipe_ids) <= MAX_RECIPE_IDS:
+            return queryset.exclude(id__in=recipe_ids)
+        return queryset.filter(~self.has_ingredients(value))
 
-class IngredientSearchFilter(SearchFilter):
-    search_param = 'name'
+    def get_ordering(self, queryset, name, value):
+        return queryset.order_by(ORDERING_FIELDS[value], '-id')
@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+KEY_TEMPLATE = 'recipe_fragment:{recipe_id}'
+
+
+def get_key(recipe_id):
+    return KEY_TEMPLATE.format(recipe_id=recipe_id)
+
+
+def get_many(recipe_ids):
+    keys = {get_key(recipe_id): recipe_id for recipe_id in recipe_ids}
+    return {
+        keys[key]: fragment
+        for key, fragment in cache.get_many(keys).items()
+    }
+
+
+def set_many(fragments):
+    cache.set_many(
+        {get_key(recipe_id): fragment
+         for recipe_id, fragment in fragments.items()},
+        settings.RECIPE_FRAGMENT_CACHE_TIMEOUT,
+    )
+
+
+def invalidate(recipe_ids):
+    keys = [get_key(recipe_id) for recipe_id in recipe_ids]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
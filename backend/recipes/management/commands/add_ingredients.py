@@ -2,6 +2,7 @@ from csv import reader
 
 from django.core.management.base import BaseCommand
 
+from recipes import catalogs
 from recipes.models import Ingredient
 
 
@@ -10,10 +11,15 @@ class Command(BaseCommand):
     help = "Load ingredients from csv file."
 
     def handle(self, *args, **kwargs):
+        existing = set(
+            Ingredient.objects.values_list('name', 'measurement_unit'))
         with open(
                 'data/ingredients.csv', 'r', encoding='UTF-8') as ingredients:
-            for row in reader(ingredients):
-                if len(row) == 2:
-                    Ingredient.objects.get_or_create(
-                        name=row[0], measurement_unit=row[1],
-                    )
+            rows = dict.fromkeys(
+                tuple(row) for row in reader(ingredients) if len(row) == 2)
+        Ingredient.objects.bulk_create(
+            Ingredient(name=name, measurement_unit=measurement_unit)
+            for name, measurement_unit in rows
+            if (name, measurement_unit) not in existing
+        )
+        catalogs.ingredients.bump()
@@ -2,6 +2,7 @@ from csv import reader
 
 from django.core.management.base import BaseCommand
 
+from recipes import catalogs
 from recipes.models import Tag
 
 
@@ -10,9 +11,13 @@ class Command(BaseCommand):
     help = "Load tags from csv file."
 
     def handle(self, *args, **kwargs):
+        existing = set(Tag.objects.values_list('name', 'color', 'slug'))
         with open('data/tags.csv', 'r', encoding='UTF-8') as tags:
-            for row in reader(tags):
-                if len(row) == 3:
-                    Tag.objects.get_or_create(
-                        name=row[0], color=row[1], slug=row[2]
-                    )
+            rows = dict.fromkeys(
+                tuple(row) for row in reader(tags) if len(row) == 3)
+        Tag.objects.bulk_create(
+            Tag(name=name, color=color, slug=slug)
+            for name, color, slug in rows
+            if (name, color, slug) not in existing
+        )
+        catalogs.tags.bump()
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from recipes import shopping_lists
+
+
+class Command(BaseCommand):
+    """Shopping lists rebuilder."""
+    help = "Rebuild aggregated shopping lists from shopping carts."
+
+    def handle(self, *args, **kwargs):
+        shopping_lists.rebuild()
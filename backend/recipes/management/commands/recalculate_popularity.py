@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from recipes import popularity
+
+
+class Command(BaseCommand):
+    """Recipe popularity recalculator."""
+    help = "Recalculate recipe popularity from favorites and shopping carts."
+
+    def handle(self, *args, **kwargs):
+        popularity.recalculate()
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from recipes import counters
+
+
+class Command(BaseCommand):
+    """Denormalized counters reconciler."""
+    help = "Recount favorites, shopping carts and recipes of every author."
+
+    def handle(self, *args, **kwargs):
+        counters.reconcile()
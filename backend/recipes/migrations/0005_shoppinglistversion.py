@@ -0,0 +1,27 @@
+# Generated by Django 3.2.7 on 2026-10-18 11:03
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('recipes', '0004_shoppinglistitem'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ShoppingListVersion',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='shopping_list_version', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+                ('version', models.PositiveIntegerField(default=0, verbose_name='Версия')),
+            ],
+            options={
+                'verbose_name': 'Версия списка покупок',
+                'verbose_name_plural': 'Версии списков покупок',
+            },
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 3.2.7 on 2026-10-18 15:40
+
+from collections import defaultdict
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+WEIGHTS = {
+    'Favorite': 1.0,
+    'ShoppingCart': 0.5,
+}
+
+
+def fill_popularity(apps, schema_editor):
+    Recipe = apps.get_model('recipes', 'Recipe')
+    scores = defaultdict(float)
+    for model_name, weight in WEIGHTS.items():
+        model = apps.get_model('recipes', model_name)
+        for recipe_id, created in model.objects.values_list(
+                'recipe_id', 'created').iterator():
+            age = (created - settings.POPULARITY_EPOCH).total_seconds()
+            scores[recipe_id] += weight * 2 ** (
+                age / settings.POPULARITY_HALF_LIFE)
+    Recipe.objects.bulk_update(
+        (Recipe(id=recipe_id, popularity=score)
+         for recipe_id, score in scores.items()),
+        ('popularity',),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0006_catalogversion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='favorite',
+            name='created',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now, verbose_name='Дата добавления'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='shoppingcart',
+            name='created',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now, verbose_name='Дата добавления'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='popularity',
+            field=models.FloatField(db_index=True, default=0, verbose_name='Популярность'),
+        ),
+        migrations.RunPython(fill_popularity, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,11 @@
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator
-from django.db.models import (CASCADE, CharField, ForeignKey, ImageField,
-                              ManyToManyField, Model, PositiveIntegerField,
-                              SlugField, TextField, UniqueConstraint)
+from django.db.models import (CASCADE, BigIntegerField, BooleanField,
+                              CharField, DateTimeField, Exists, FloatField,
+                              ForeignKey, ImageField, Index, ManyToManyField,
+                              Model, OneToOneField, OuterRef,
+                              PositiveIntegerField, QuerySet, SlugField,
+                              TextField, UniqueConstraint, Value)
 
 User = get_user_model()
 
@@ -40,6 +43,22 @@ class Ingredient(Model):
         return f'{self.name}'
 
 
+class RecipeQuerySet(QuerySet):
+
+    def with_user_flags(self, user):
+        if user.is_anonymous:
+            return self.annotate(
+                is_favorited=Value(False, output_field=BooleanField()),
+                is_in_shopping_cart=Value(False, output_field=BooleanField()),
+            )
+        return self.annotate(
+            is_favorited=Exists(Favorite.objects.filter(
+                user=user, recipe=OuterRef('pk'))),
+            is_in_shopping_cart=Exists(ShoppingCart.objects.filter(
+                user=user, recipe=OuterRef('pk'))),
+        )
+
+
 class Recipe(Model):
     name = CharField('Название', max_length=200)
     text = TextField('Описание')
@@ -67,6 +86,14 @@ class Recipe(Model):
         related_name='recipes',
         verbose_name='Автор',
     )
+    popularity = FloatField('Популярность', default=0, db_index=True)
+    favorites_count = PositiveIntegerField(
+        'В избранном', default=0, db_index=True)
+    in_carts_count = PositiveIntegerField('В списках покупок', default=0)
+    created = DateTimeField('Дата создания', auto_now_add=True)
+    modified = DateTimeField('Дата изменения', auto_now=True, db_index=True)
+
+    objects = RecipeQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Рецепт'
@@ -122,6 +149,7 @@ class Favorite(Model):
         related_name='favorites',
         verbose_name='Рецепт',
     )
+    created = DateTimeField('Дата добавления', auto_now_add=True)
 
     class Meta:
         verbose_name = 'Избранное'
@@ -147,6 +175,7 @@ class ShoppingCart(Model):
         related_name='shopping_cart',
         verbose_name='Рецепты',
     )
+    created = DateTimeField('Дата добавления', auto_now_add=True)
 
     class Meta:
         verbose_name = 'Список покупок'
@@ -157,3 +186,96 @@ class ShoppingCart(Model):
                 name='unique_shopping_cart',
             ),
         )
+
+
+class ShoppingListItem(Model):
+    user = ForeignKey(
+        User,
+        on_delete=CASCADE,
+        related_name='shopping_list',
+        verbose_name='Пользователь',
+    )
+    ingredient = ForeignKey(
+        Ingredient,
+        on_delete=CASCADE,
+        verbose_name='Ингредиент',
+    )
+    amount = PositiveIntegerField('Количество')
+
+    class Meta:
+        verbose_name = 'Позиция списка покупок'
+        verbose_name_plural = 'Позиции списка покупок'
+        constraints = (
+            UniqueConstraint(
+                fields=('user', 'ingredient'),
+                name='unique_shopping_list_item',
+            ),
+        )
+
+
+class ShoppingListVersion(Model):
+    user = OneToOneField(
+        User,
+        on_delete=CASCADE,
+        primary_key=True,
+        related_name='shopping_list_version',
+        verbose_name='Пользователь',
+    )
+    version = PositiveIntegerField('Версия', default=0)
+
+    class Meta:
+        verbose_name = 'Версия списка покупок'
+        verbose_name_plural = 'Версии списков покупок'
+
+
+class RecipeTombstone(Model):
+    recipe_id = BigIntegerField('Рецепт')
+    deleted = DateTimeField('Дата удаления', auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name = 'Удаленный рецепт'
+        verbose_name_plural = 'Удаленные рецепты'
+
+
+class FeedEntry(Model):
+    user = ForeignKey(
+        User,
+        on_delete=CASCADE,
+        related_name='feed',
+        verbose_name='Подписчик',
+    )
+    recipe = ForeignKey(
+        Recipe,
+        on_delete=CASCADE,
+        related_name='feed_entries',
+        verbose_name='Рецепт',
+    )
+    author = ForeignKey(
+        User,
+        on_delete=CASCADE,
+        related_name='+',
+        verbose_name='Автор',
+    )
+
+    class Meta:
+        verbose_name = 'Запись ленты'
+        verbose_name_plural = 'Записи ленты'
+        constraints = (
+            UniqueConstraint(
+                fields=('user', 'recipe'),
+                name='unique_feed_entry',
+            ),
+        )
+        indexes = (
+            Index(fields=('user', 'author'), name='feed_entry_author_idx'),
+        )
+
+
+class CatalogVersion(Model):
+    name = CharField('Каталог', max_length=50, primary_key=True)
+    version = PositiveIntegerField('Версия', default=0)
+    modified = DateTimeField('Изменен', auto_now=True)
+
+    class Meta:
+        verbose_name = 'Версия каталога'
+        verbose_name_plural = 'Версии каталогов'
@@ -0,0 +1,55 @@
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from . import versions
+from .models import CountOfIngredient
+
+
+class PantryIndex(versions.VersionedIndex):
+    """Process-local recipe × ingredient incidence matrix.
+
+    Rows are recipes and columns ingredients, both sorted by id. Ranking a
+    pantry is one sparse matrix-vector product and a ``lexsort``, so no
+    Python code runs per recipe. The matrix is rebuilt when the
+    ``recipe_ingredients`` version changes.
+    """
+    tracked_versions = (versions.recipe_ingredients,)
+
+    @staticmethod
+    def build():
+        pairs = np.array(CountOfIngredient.objects.values_list(
+            'recipe_id', 'ingredient_id'), dtype=np.int64).reshape(-1, 2)
+        recipe_ids, rows = np.unique(pairs[:, 0], return_inverse=True)
+        ingredient_ids, columns = np.unique(pairs[:, 1], return_inverse=True)
+        matrix = csr_matrix(
+            (np.ones(len(pairs), dtype=np.int32), (rows, columns)),
+            shape=(len(recipe_ids), len(ingredient_ids)),
+        )
+        matrix.data[:] = 1
+        totals = np.asarray(matrix.sum(axis=1)).ravel()
+        return recipe_ids, ingredient_ids, matrix, totals
+
+    def rank(self, ingredient_ids):
+        """Return ids and missing counts of recipes using the ingredients.
+
+        Fully cookable recipes come first, then those missing the fewest
+        ingredients; ties go to recipes using more of the pantry, then to
+        newer recipes.
+        """
+        recipe_ids, columns, matrix, totals = self.get_data()
+        pantry = np.zeros(len(columns), dtype=np.int32)
+        ingredient_ids = np.asarray(ingredient_ids, dtype=np.int64)
+        positions = np.searchsorted(columns, ingredient_ids)
+        known = positions < len(columns)
+        known[known] = columns[positions[known]] == ingredient_ids[known]
+        pantry[positions[known]] = 1
+        have = matrix.dot(pantry)
+        matched = np.flatnonzero(have)
+        have = have[matched]
+        missing = totals[matched] - have
+        recipe_ids = recipe_ids[matched]
+        order = np.lexsort((-recipe_ids, -have, missing))
+        return recipe_ids[order].tolist(), missing[order].tolist()
+
+
+pantry_index = PantryIndex()
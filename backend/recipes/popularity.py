@@ -0,0 +1,93 @@
+"""Time-decayed recipe popularity.
+
+Every favorite or shopping cart entry adds ``weight * 2 ** (-age /
+half_life)`` to the score of its recipe. Scores are stored multiplied by
+``2 ** ((now - epoch) / half_life)``, so a single entry contributes the
+constant ``weight * 2 ** ((created - epoch) / half_life)``. That keeps the
+ordering correct as time passes, lets additions and removals adjust the
+score incrementally, and means only ``recalculate_popularity`` has to scan
+the tables.
+
+Scores double every half-life and overflow a float after about
+``MAX_HALF_LIVES`` half-lives past the epoch: some 19 years with a 7-day
+half-life. Well before that, move ``POPULARITY_EPOCH`` to a recent date and
+run ``recalculate_popularity`` right after the deploy; until it finishes,
+entries added meanwhile weigh too little against old scores. The
+``recipes.W001`` check warns once fewer than ``EPOCH_WARNING_HALF_LIVES``
+half-lives are left.
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from django.core import checks
+from django.db import transaction
+from django.db.models import Case, F, FloatField, Value, When
+from django.utils import timezone
+
+from .models import Favorite, Recipe, ShoppingCart
+
+WEIGHTS = {
+    Favorite: 1.0,
+    ShoppingCart: 0.5,
+}
+BATCH_SIZE = 1000
+# Floats overflow at 2 ** 1024; the rest is headroom for summed weights.
+MAX_HALF_LIVES = 1000
+EPOCH_WARNING_HALF_LIVES = 52
+
+
+def get_score(model, created):
+    age = (created - settings.POPULARITY_EPOCH).total_seconds()
+    return WEIGHTS[model] * 2 ** (age / settings.POPULARITY_HALF_LIFE)
+
+
+def change_scores(model, entries, sign):
+    scores = defaultdict(float)
+    for recipe_id, created in entries:
+        scores[recipe_id] += sign * get_score(model, created)
+    if scores:
+        Recipe.objects.filter(id__in=scores).update(popularity=F(
+            'popularity') + Case(
+            *(When(id=recipe_id, then=Value(score))
+              for recipe_id, score in scores.items()),
+            output_field=FloatField(),
+        ))
+
+
+def add_entries(model, entries):
+    """Add the score of inserted ``(recipe_id, created)`` entries."""
+    change_scores(model, entries, 1)
+
+
+def remove_entries(model, entries):
+    """Take back the score of deleted ``(recipe_id, created)`` entries."""
+    change_scores(model, entries, -1)
+
+
+@transaction.atomic
+def recalculate():
+    scores = defaultdict(float)
+    for model in WEIGHTS:
+        for recipe_id, created in model.objects.values_list(
+                'recipe_id', 'created').iterator():
+            scores[recipe_id] += get_score(model, created)
+    Recipe.objects.exclude(popularity=0).update(popularity=0)
+    Recipe.objects.bulk_update(
+        (Recipe(id=recipe_id, popularity=score)
+         for recipe_id, score in scores.items()),
+        ('popularity',),
+        batch_size=BATCH_SIZE,
+    )
+
+
+@checks.register()
+def check_epoch(app_configs, **kwargs):
+    age = (timezone.now() - settings.POPULARITY_EPOCH).total_seconds()
+    left = MAX_HALF_LIVES - age / settings.POPULARITY_HALF_LIFE
+    if left >= EPOCH_WARNING_HALF_LIVES:
+        return []
+    return [checks.Warning(
+        f'Popularity scores overflow in {max(left, 0):.0f} half-lives.',
+        hint='Move POPULARITY_EPOCH forward and run recalculate_popularity.',
+        id='recipes.W001',
+    )]
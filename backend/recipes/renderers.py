@@ -0,0 +1,98 @@
+import csv
+import io
+import os
+
+from django.conf import settings
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
+from rest_framework.renderers import BaseRenderer
+
+PDF_FONT_NAME = 'ShoppingListFont'
+PDF_FONT_SIZE = 12
+PDF_LINE_HEIGHT = 18
+PDF_MARGIN = 50
+
+
+class ShoppingListRenderer(BaseRenderer):
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, dict):
+            return '\n'.join(
+                f'{key}: {value}' for key, value in data.items()
+            ).encode('utf-8')
+        return self.render_items(data)
+
+    def render_items(self, items):
+        raise NotImplementedError
+
+
+class TextShoppingListRenderer(ShoppingListRenderer):
+    media_type = 'text/plain'
+    format = 'txt'
+
+    def render_items(self, items):
+        lines = ['список:']
+        for number, item in enumerate(items, start=1):
+            lines.append(
+                f'{number} '
+                f'{item["name"]} - '
+                f'{item["amount"]} '
+                f'{item["measurement_unit"]}')
+        return ('\n'.join(lines) + '\n').encode(self.charset)
+
+
+class CSVShoppingListRenderer(ShoppingListRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+    def render_items(self, items):
+        output = io.StringIO()
+        writer = csv.writer(output)
+        writer.writerow(('Ингредиент', 'Количество', 'Единица измерения'))
+        for item in items:
+            writer.writerow(
+                (item['name'], item['amount'], item['measurement_unit']))
+        return output.getvalue().encode(self.charset)
+
+
+class PDFShoppingListRenderer(ShoppingListRenderer):
+    media_type = 'application/pdf'
+    format = 'pdf'
+    charset = None
+
+    @staticmethod
+    def get_font():
+        if PDF_FONT_NAME in pdfmetrics.getRegisteredFontNames():
+            return PDF_FONT_NAME
+        if not os.path.exists(settings.PDF_FONT_PATH):
+            return 'Helvetica'
+        pdfmetrics.registerFont(TTFont(PDF_FONT_NAME, settings.PDF_FONT_PATH))
+        return PDF_FONT_NAME
+
+    def render_items(self, items):
+        output = io.BytesIO()
+        pdf = canvas.Canvas(output, pagesize=A4)
+        font = self.get_font()
+        _, height = A4
+        top = height - PDF_MARGIN
+        lines = [
+            f'{number}. {item["name"]} ({item["measurement_unit"]}) '
+            f'- {item["amount"]}'
+            for number, item in enumerate(items, start=1)
+        ]
+        pdf.setFont(font, PDF_FONT_SIZE + 4)
+        pdf.drawString(PDF_MARGIN, top, 'Список покупок')
+        y = top - 2 * PDF_LINE_HEIGHT
+        pdf.setFont(font, PDF_FONT_SIZE)
+        for line in lines:
+            if y < PDF_MARGIN:
+                pdf.showPage()
+                pdf.setFont(font, PDF_FONT_SIZE)
+                y = top
+            pdf.drawString(PDF_MARGIN, y, line)
+            y -= PDF_LINE_HEIGHT
+        pdf.save()
+        return output.getvalue()
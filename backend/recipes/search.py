@@ -0,0 +1,171 @@
+from bisect import bisect_left
+from collections import defaultdict, namedtuple
+from functools import partial, reduce
+
+import numpy as np
+from django.utils import timezone
+
+from . import catalogs, sync, versions
+from .models import CountOfIngredient, Ingredient
+
+PREFIX_END = '\U0010ffff'
+EMPTY = np.empty(0, dtype=np.int64)
+# Past this share of changed recipes a full rebuild is cheaper.
+MAX_REFRESH_SHARE = 0.25
+
+
+class IngredientIndex(versions.VersionedIndex):
+    """Process-local sorted index of ingredient names for prefix search.
+
+    Full names and the starts of every following word are kept in two
+    sorted lists, so a query is a pair of binary searches plus a walk over
+    at most ``limit`` matches. Exact and full-name prefix matches come
+    first, matches on a later word of the name follow. The index is rebuilt
+    when the ingredients catalog version changes.
+    """
+    tracked_versions = (catalogs.ingredients,)
+
+    @staticmethod
+    def build():
+        names = []
+        words = []
+        for ingredient_id, name, unit in Ingredient.objects.values_list(
+                'id', 'name', 'measurement_unit'):
+            key = name.lower()
+            entry = {'id': ingredient_id, 'name': name,
+                     'measurement_unit': unit}
+            names.append((key, ingredient_id, entry))
+            for position, char in enumerate(key[1:], start=1):
+                if not char.isspace() and key[position - 1].isspace():
+                    words.append((key[position:], ingredient_id, entry))
+        names.sort(key=lambda item: item[:2])
+        words.sort(key=lambda item: item[:2])
+        return (
+            [key for key, _, _ in names], names,
+            [key for key, _, _ in words], words,
+        )
+
+    @staticmethod
+    def get_range(keys, prefix):
+        return (bisect_left(keys, prefix),
+                bisect_left(keys, prefix + PREFIX_END))
+
+    def search(self, prefix, limit=None):
+        prefix = prefix.strip().lower()
+        name_keys, names, word_keys, words = self.get_data()
+        start, end = self.get_range(name_keys, prefix)
+        results = [entry for _, _, entry in names[start:end][:limit]]
+        if limit is not None and len(results) >= limit:
+            return results
+        seen = {entry['id'] for entry in results}
+        start, end = self.get_range(word_keys, prefix)
+        for _, ingredient_id, entry in words[start:end]:
+            if ingredient_id in seen:
+                continue
+            seen.add(ingredient_id)
+            results.append(entry)
+            if limit is not None and len(results) >= limit:
+                break
+        return results
+
+
+RecipeIngredients = namedtuple(
+    'RecipeIngredients', 'since recipes ingredients')
+
+
+class RecipeIngredientIndex(versions.VersionedIndex):
+    """Process-local inverted index from ingredient id to recipe ids.
+
+    The recipes of every ingredient are kept as a sorted numpy array, so
+    "contains all" and "contains none" queries are a few set operations over
+    arrays no longer than the matching recipes. When the
+    ``recipe_ingredients`` version changes, only recipes modified or deleted
+    since the previous refresh (less ``sync.COMMIT_MARGIN``) are reloaded and
+    moved between the arrays of their old and new ingredients.
+    """
+    tracked_versions = (versions.recipe_ingredients,)
+
+    @staticmethod
+    def get_ingredients(recipe_ids=None):
+        queryset = CountOfIngredient.objects.all()
+        if recipe_ids is not None:
+            queryset = queryset.filter(recipe_id__in=recipe_ids)
+        ingredients = defaultdict(list)
+        for recipe_id, ingredient_id in queryset.values_list(
+                'recipe_id', 'ingredient_id').iterator():
+            ingredients[recipe_id].append(ingredient_id)
+        return ingredients
+
+    @staticmethod
+    def to_array(recipe_ids):
+        return np.unique(np.array(recipe_ids, dtype=np.int64))
+
+    def build(self):
+        since = timezone.now()
+        ingredients = self.get_ingredients()
+        recipes = defaultdict(list)
+        for recipe_id, ingredient_ids in ingredients.items():
+            for ingredient_id in ingredient_ids:
+                recipes[ingredient_id].append(recipe_id)
+        return RecipeIngredients(since, {
+            ingredient_id: self.to_array(recipe_ids)
+            for ingredient_id, recipe_ids in recipes.items()
+        }, {
+            recipe_id: tuple(ingredient_ids)
+            for recipe_id, ingredient_ids in ingredients.items()
+        })
+
+    def refresh(self, data):
+        since = timezone.now()
+        changed = sync.get_changed(data.since - sync.COMMIT_MARGIN)
+        if len(changed) > len(data.ingredients) * MAX_REFRESH_SHARE:
+            return self.build()
+        new = self.get_ingredients(changed)
+        ingredients = data.ingredients.copy()
+        affected = set()
+        for recipe_id in changed:
+            affected.update(ingredients.pop(recipe_id, ()))
+            if recipe_id in new:
+                ingredients[recipe_id] = tuple(new[recipe_id])
+                affected.update(new[recipe_id])
+        added = defaultdict(list)
+        for recipe_id, ingredient_ids in new.items():
+            for ingredient_id in ingredient_ids:
+                added[ingredient_id].append(recipe_id)
+        changed = self.to_array(changed)
+        recipes = data.recipes.copy()
+        for ingredient_id in affected:
+            recipe_ids = np.union1d(
+                np.setdiff1d(recipes.get(ingredient_id, EMPTY), changed,
+                             assume_unique=True),
+                added.get(ingredient_id, EMPTY))
+            if len(recipe_ids):
+                recipes[ingredient_id] = recipe_ids
+            else:
+                recipes.pop(ingredient_id, None)
+        return RecipeIngredients(since, recipes, ingredients)
+
+    def contains_all(self, ingredient_ids, exclude_ids=()):
+        recipes = self.get_data().recipes
+        arrays = sorted((recipes.get(ingredient_id, EMPTY)
+                         for ingredient_id in set(ingredient_ids)), key=len)
+        recipe_ids = reduce(
+            partial(np.intersect1d, assume_unique=True), arrays)
+        if exclude_ids and len(recipe_ids):
+            recipe_ids = np.setdiff1d(
+                recipe_ids, self.union(recipes, exclude_ids),
+                assume_unique=True)
+        return recipe_ids.tolist()
+
+    @staticmethod
+    def union(recipes, ingredient_ids):
+        return np.unique(np.concatenate([EMPTY] + [
+            recipes.get(ingredient_id, EMPTY)
+            for ingredient_id in set(ingredient_ids)]))
+
+    def contains_any(self, ingredient_ids):
+        return self.union(self.get_data().recipes, ingredient_ids).tolist()
+
+
+ingredient_index = IngredientIndex()
+recipe_ingredient_index = RecipeIngredientIndex()
@@ -1,8 +1,15 @@
+from collections import OrderedDict
+
+from django.db import transaction
+from django.db.models import Manager, Prefetch, prefetch_related_objects
 from drf_extra_fields.fields import Base64ImageField
 from rest_framework import serializers
+from recipes import fragments as fragment_cache
+from recipes import shopping_lists, versions
 from recipes.models import (CountOfIngredient, Favorite, Ingredient, Recipe,
-                            ShoppingCart, Tag)
-from users.serializers import CustomUserSerializer
+                            ShoppingCart, ShoppingListItem, Tag)
+from recipes.similarity import MAX_SIMILAR
+from users.serializers import AuthorSerializer, CustomUserSerializer
 
 
 class IngredientSerializer(serializers.ModelSerializer):
@@ -28,10 +35,73 @@ class RecipeIngredientReadSerializer(serializers.ModelSerializer):
         fields = ('id', 'name', 'measurement_unit', 'amount',)
 
 
-class RecipeReadSerializer(serializers.ModelSerializer):
+class ShoppingListItemSerializer(serializers.ModelSerializer):
+    id = serializers.ReadOnlyField(source='ingredient.id')
+    name = serializers.ReadOnlyField(source='ingredient.name')
+    measurement_unit = serializers.ReadOnlyField(
+        source='ingredient.measurement_unit')
+
+    class Meta:
+        model = ShoppingListItem
+        fields = ('id', 'name', 'measurement_unit', 'amount',)
+
+
+class RecipeFragmentSerializer(serializers.ModelSerializer):
+    """User-independent part of a recipe representation."""
     tags = TagSerializer(many=True, read_only=True)
+    author = AuthorSerializer(read_only=True)
+    ingredients = RecipeIngredientReadSerializer(
+        source='countofingredient_set', many=True, read_only=True)
+    image = serializers.SerializerMethodField(read_only=True)
+
+    class Meta:
+        model = Recipe
+        fields = (
+            'id', 'name', 'tags', 'author', 'ingredients', 'image', 'text',
+            'cooking_time',
+        )
+
+    @staticmethod
+    def get_image(obj):
+        return obj.image.url if obj.image else None
+
+
+def get_recipe_fragments(recipes):
+    fragments = fragment_cache.get_many([recipe.id for recipe in recipes])
+    missing = [recipe for recipe in recipes if recipe.id not in fragments]
+    if missing:
+        prefetch_related_objects(
+            missing,
+            'author',
+            'tags',
+            Prefetch(
+                'countofingredient_set',
+                queryset=CountOfIngredient.objects.select_related(
+                    'ingredient'),
+            ),
+        )
+        built = {
+            recipe.id: RecipeFragmentSerializer(recipe).data
+            for recipe in missing
+        }
+        fragment_cache.set_many(built)
+        fragments.update(built)
+    return fragments
+
+
+class RecipeListSerializer(serializers.ListSerializer):
+
+    def to_representation(self, data):
+        recipes = list(data.all() if isinstance(data, Manager) else data)
+        fragments = get_recipe_fragments(recipes)
+        return [
+            self.child.overlay(recipe, fragments[recipe.id])
+            for recipe in recipes
+        ]
+
+
+class RecipeReadSerializer(RecipeFragmentSerializer):
     author = CustomUserSerializer(read_only=True)
-    ingredients = serializers.SerializerMethodField(read_only=True)
     is_favorited = serializers.SerializerMethodField(read_only=True)
     is_in_shopping_cart = serializers.SerializerMethodField(read_only=True)
 
@@ -41,12 +111,32 @@ class RecipeReadSerializer(serializers.ModelSerializer):
             'id', 'name', 'tags', 'author', 'ingredients', 'is_favorited',
             'is_in_shopping_cart', 'image', 'text', 'cooking_time',
         )
+        list_serializer_class = RecipeListSerializer
+
+    def to_representation(self, instance):
+        fragments = get_recipe_fragments([instance])
+        return self.overlay(instance, fragments[instance.id])
 
-    def get_ingredients(self, obj):
-        queryset = CountOfIngredient.objects.filter(recipe=obj)
-        return RecipeIngredientReadSerializer(queryset, many=True).data
+    def overlay(self, recipe, fragment):
+        request = self.context.get('request')
+        image = fragment['image']
+        if image and request:
+            image = request.build_absolute_uri(image)
+        author = OrderedDict(fragment['author'])
+        author['is_subscribed'] = self.fields['author'].is_subscribed_to(
+            recipe.author_id)
+        values = dict(
+            fragment,
+            author=author,
+            image=image,
+            is_favorited=self.get_is_favorited(recipe),
+            is_in_shopping_cart=self.get_is_in_shopping_cart(recipe),
+        )
+        return OrderedDict((name, values[name]) for name in self.Meta.fields)
 
     def get_is_in_shopping_cart(self, obj):
+        if hasattr(obj, 'is_in_shopping_cart'):
+            return obj.is_in_shopping_cart
         request = self.context.get('request')
         if not request or request.user.is_anonymous:
             return False
@@ -54,6 +144,8 @@ class RecipeReadSerializer(serializers.ModelSerializer):
             user=request.user, recipe=obj).exists()
 
     def get_is_favorited(self, obj):
+        if hasattr(obj, 'is_favorited'):
+            return obj.is_favorited
         request = self.context.get('request')
         if not request or request.user.is_anonymous:
             return False
@@ -61,7 +153,7 @@ class RecipeReadSerializer(serializers.ModelSerializer):
 
 
 class RecipeIngredientWriteSerializer(serializers.ModelSerializer):
-    id = serializers.PrimaryKeyRelatedField(queryset=Ingredient.objects.all())
+    id = serializers.IntegerField()
     amount = serializers.IntegerField()
 
     class Meta:
@@ -70,33 +162,50 @@ class RecipeIngredientWriteSerializer(serializers.ModelSerializer):
 
 
 class RecipeSerializer(serializers.ModelSerializer):
-    tags = serializers.PrimaryKeyRelatedField(
-        queryset=Tag.objects.all(), many=True)
+    tags = serializers.ListField(child=serializers.IntegerField())
     ingredients = RecipeIngredientWriteSerializer(many=True)
     author = CustomUserSerializer(read_only=True)
     image = Base64ImageField()
 
+    UPDATE_FIELDS = ('image', 'name', 'text', 'cooking_time', 'modified')
+
     class Meta:
         model = Recipe
         fields = ('id', 'author', 'ingredients', 'tags', 'image',
                   'name', 'text', 'cooking_time')
 
-    def validate(self, data):
-        ingredients = self.initial_data.get('ingredients')
-        ingredients_list = []
-        for ingredient in ingredients:
-            ingredient_id = ingredient['id']
-            if ingredient_id in ingredients_list:
-                raise serializers.ValidationError({
-                    'ingredient': 'Ингредиенты должны быть уникальными!'
-                })
-            ingredients_list.append(ingredient_id)
-            amount = ingredient['amount']
-            if int(amount) <= 0:
-                raise serializers.ValidationError({
-                    'amount': 'Количество ингредиента должно быть больше нуля!'
-                })
+    @staticmethod
+    def get_missing_ids(model, ids):
+        found = set(
+            model.objects.filter(id__in=ids).values_list('id', flat=True))
+        return sorted(set(ids) - found)
+
+    def validate_tags(self, tags):
+        missing = self.get_missing_ids(Tag, tags)
+        if missing:
+            raise serializers.ValidationError(
+                f'Теги не найдены: {", ".join(map(str, missing))}'
+            )
+        return list(dict.fromkeys(tags))
+
+    def validate_ingredients(self, ingredients):
+        ingredient_ids = [ingredient['id'] for ingredient in ingredients]
+        if len(set(ingredient_ids)) != len(ingredient_ids):
+            raise serializers.ValidationError(
+                'Ингредиенты должны быть уникальными!'
+            )
+        if any(ingredient['amount'] <= 0 for ingredient in ingredients):
+            raise serializers.ValidationError(
+                'Количество ингредиента должно быть больше нуля!'
+            )
+        missing = self.get_missing_ids(Ingredient, ingredient_ids)
+        if missing:
+            raise serializers.ValidationError(
+                f'Ингредиенты не найдены: {", ".join(map(str, missing))}'
+            )
+        return ingredients
 
+    def validate(self, data):
         cooking_time = self.initial_data.get('cooking_time')
         if int(cooking_time) <= 0:
             raise serializers.ValidationError({
@@ -106,37 +215,72 @@ class RecipeSerializer(serializers.ModelSerializer):
 
     @staticmethod
     def create_ingredients(ingredients, recipe):
-        for ingredient in ingredients:
-            CountOfIngredient.objects.create(
-                recipe=recipe, ingredient=ingredient['id'],
+        CountOfIngredient.objects.bulk_create(
+            CountOfIngredient(
+                recipe=recipe, ingredient_id=ingredient['id'],
                 amount=ingredient['amount'])
+            for ingredient in ingredients
+        )
+        versions.recipe_ingredients.bump_on_commit()
 
     @staticmethod
-    def create_tags(tags, recipe):
-        for tag in tags:
-            recipe.tags.add(tag)
-
+    def update_ingredients(ingredients, recipe):
+        current = {
+            item.ingredient_id: item
+            for item in CountOfIngredient.objects.filter(recipe=recipe)
+        }
+        added = []
+        changed = []
+        amount_changes = {}
+        for ingredient in ingredients:
+            item = current.pop(ingredient['id'], None)
+            if item is None:
+                added.append(CountOfIngredient(
+                    recipe=recipe, ingredient_id=ingredient['id'],
+                    amount=ingredient['amount']))
+                amount_changes[ingredient['id']] = ingredient['amount']
+            elif item.amount != ingredient['amount']:
+                amount_changes[ingredient['id']] = (
+                    ingredient['amount'] - item.amount)
+                item.amount = ingredient['amount']
+                changed.append(item)
+        for ingredient_id, item in current.items():
+            amount_changes[ingredient_id] = -item.amount
+        if current:
+            CountOfIngredient.objects.filter(
+                id__in=[item.id for item in current.values()]).delete()
+        CountOfIngredient.objects.bulk_update(changed, ('amount',))
+        CountOfIngredient.objects.bulk_create(added)
+        if added or current:
+            versions.recipe_ingredients.bump_on_commit()
+        shopping_lists.update_recipe(recipe, amount_changes)
+
+    @transaction.atomic
     def create(self, validated_data):
         author = self.context.get('request').user
         tags = validated_data.pop('tags')
         ingredients = validated_data.pop('ingredients')
         recipe = Recipe.objects.create(author=author, **validated_data)
-        self.create_tags(tags, recipe)
+        recipe.tags.add(*tags)
         self.create_ingredients(ingredients, recipe)
         return recipe
 
+    @transaction.atomic
     def update(self, instance, validated_data):
-        instance.tags.clear()
-        CountOfIngredient.objects.filter(recipe=instance).delete()
-        self.create_tags(validated_data.pop('tags'), instance)
-        self.create_ingredients(validated_data.pop('ingredients'), instance)
-        return super().update(instance, validated_data)
+        instance.tags.set(validated_data.pop('tags'))
+        self.update_ingredients(validated_data.pop('ingredients'), instance)
+        for field, value in validated_data.items():
+            setattr(instance, field, value)
+        # Counters and popularity are updated concurrently with F().
+        instance.save(update_fields=self.UPDATE_FIELDS)
+        return instance
 
     def to_representation(self, instance):
         request = self.context.get('request')
-        context = {'request': request}
+        instance = Recipe.objects.with_user_flags(
+            request.user).get(pk=instance.pk)
         return RecipeReadSerializer(
-            instance, context=context).data
+            instance, context=self.context).data
 
 
 class RepresentationSerializer(serializers.ModelSerializer):
@@ -145,25 +289,26 @@ class RepresentationSerializer(serializers.ModelSerializer):
         fields = ('id', 'name', 'image', 'cooking_time')
 
 
-class ShoppingCartSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = ShoppingCart
-        fields = ('user', 'recipe')
+class PantrySerializer(serializers.Serializer):
+    ingredients = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=1000,
+    )
 
-    def to_representation(self, instance):
-        request = self.context.get('request')
-        context = {'request': request}
-        return RepresentationSerializer(
-            instance.recipe, context=context).data
 
+class SimilarRecipesSerializer(serializers.Serializer):
+    limit = serializers.IntegerField(
+        min_value=1, max_value=MAX_SIMILAR, default=6)
 
-class FavoriteSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = Favorite
-        fields = ('user', 'recipe')
 
-    def to_representation(self, instance):
-        request = self.context.get('request')
-        context = {'request': request}
-        return RepresentationSerializer(
-            instance.recipe, context=context).data
+class SyncSerializer(serializers.Serializer):
+    updated_since = serializers.DateTimeField()
+
+
+class RecipeIdsSerializer(serializers.Serializer):
+    recipes = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=100,
+    )
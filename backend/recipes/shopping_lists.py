@@ -0,0 +1,122 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import F, Sum
+
+from .models import (CountOfIngredient, ShoppingCart, ShoppingListItem,
+                     ShoppingListVersion)
+
+
+def get_recipe_amounts(recipe_ids):
+    return Counter(dict(
+        CountOfIngredient.objects.filter(
+            recipe_id__in=recipe_ids
+        ).values('ingredient_id').annotate(
+            total=Sum('amount')
+        ).values_list('ingredient_id', 'total')
+    ))
+
+
+def get_version(user):
+    return ShoppingListVersion.objects.filter(
+        user=user).values_list('version', flat=True).first() or 0
+
+
+def lock_users(user_ids):
+    """Lock the shopping list version rows of users until commit.
+
+    Missing rows are created first, so concurrent changes to the cart or
+    shopping list of the same user always wait for each other. Rows are
+    locked in id order to avoid deadlocks.
+    """
+    user_ids = sorted(set(user_ids))
+    ShoppingListVersion.objects.bulk_create(
+        (ShoppingListVersion(user_id=user_id) for user_id in user_ids),
+        ignore_conflicts=True,
+    )
+    list(ShoppingListVersion.objects.select_for_update().filter(
+        user_id__in=user_ids).order_by('user_id').values_list(
+        'user_id', flat=True))
+
+
+def bump_versions(user_ids):
+    ShoppingListVersion.objects.filter(
+        user_id__in=user_ids).update(version=F('version') + 1)
+
+
+@transaction.atomic
+def apply_changes(user_ids, changes):
+    """Add signed ingredient amounts to the shopping lists of users."""
+    changes = {key: value for key, value in changes.items() if value}
+    if not user_ids or not changes:
+        return
+    lock_users(user_ids)
+    items = {
+        (item.user_id, item.ingredient_id): item
+        for item in ShoppingListItem.objects.select_for_update().filter(
+            user_id__in=user_ids, ingredient_id__in=changes)
+    }
+    added, changed, removed = [], [], []
+    for user_id in user_ids:
+        for ingredient_id, delta in changes.items():
+            item = items.get((user_id, ingredient_id))
+            if item is None:
+                if delta > 0:
+                    added.append(ShoppingListItem(
+                        user_id=user_id, ingredient_id=ingredient_id,
+                        amount=delta))
+            elif item.amount + delta > 0:
+                item.amount += delta
+                changed.append(item)
+            else:
+                removed.append(item.id)
+    if removed:
+        ShoppingListItem.objects.filter(id__in=removed).delete()
+    ShoppingListItem.objects.bulk_update(changed, ('amount',))
+    ShoppingListItem.objects.bulk_create(added)
+    bump_versions(user_ids)
+
+
+def add_recipes(user, recipe_ids):
+    apply_changes([user.id], get_recipe_amounts(recipe_ids))
+
+
+def remove_recipes(user, recipe_ids):
+    amounts = get_recipe_amounts(recipe_ids)
+    apply_changes([user.id], {key: -value for key, value in amounts.items()})
+
+
+def get_cart_users(recipe):
+    return list(ShoppingCart.objects.filter(
+        recipe=recipe).values_list('user_id', flat=True))
+
+
+def update_recipe(recipe, changes):
+    apply_changes(get_cart_users(recipe), changes)
+
+
+def delete_recipe(recipe):
+    amounts = get_recipe_amounts([recipe.id])
+    apply_changes(
+        get_cart_users(recipe),
+        {key: -value for key, value in amounts.items()},
+    )
+
+
+@transaction.atomic
+def rebuild():
+    ShoppingListItem.objects.all().delete()
+    totals = CountOfIngredient.objects.filter(
+        recipe__shopping_cart__isnull=False
+    ).values(
+        'recipe__shopping_cart__user', 'ingredient'
+    ).annotate(total=Sum('amount')).order_by()
+    ShoppingListItem.objects.bulk_create(
+        ShoppingListItem(
+            user_id=row['recipe__shopping_cart__user'],
+            ingredient_id=row['ingredient'],
+            amount=row['total'],
+        )
+        for row in totals
+    )
+    ShoppingListVersion.objects.update(version=F('version') + 1)
@@ -0,0 +1,165 @@
+from django.core.signals import setting_changed
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete)
+from django.dispatch import receiver
+
+from users.models import Subscribe
+
+from . import (catalogs, counters, counts, events, feeds, fragments,
+               popularity, shopping_lists, sync, versions)
+from .models import (CountOfIngredient, Favorite, Ingredient, Recipe,
+                     RecipeTombstone, ShoppingCart, Tag, User)
+
+
+def mark_changed(recipe_ids):
+    fragments.invalidate(recipe_ids)
+    sync.touch(recipe_ids)
+
+
+@receiver(pre_delete, sender=Recipe)
+def remove_from_shopping_lists(sender, instance, **kwargs):
+    shopping_lists.delete_recipe(instance)
+
+
+@receiver(post_save, sender=Recipe)
+def count_created_recipe(sender, instance, created, **kwargs):
+    if created:
+        counters.change_recipes_count(instance.author_id, 1)
+
+
+@receiver(post_save, sender=Recipe)
+def add_recipe_to_feeds(sender, instance, created, **kwargs):
+    if not created:
+        return
+    follower_ids = list(Subscribe.objects.filter(
+        following_id=instance.author_id).values_list('user_id', flat=True))
+    feeds.add_recipe(instance, follower_ids)
+    events.publish(follower_ids, 'recipe_published', {
+        'id': instance.id,
+        'name': instance.name,
+        'author': instance.author_id,
+    })
+
+
+@receiver(post_save, sender=Subscribe)
+def fill_feed(sender, instance, created, **kwargs):
+    if created:
+        feeds.follow(instance.user_id, instance.following_id)
+
+
+@receiver(post_delete, sender=Subscribe)
+def trim_feed(sender, instance, **kwargs):
+    feeds.unfollow(instance.user_id, instance.following_id)
+
+
+@receiver(post_delete, sender=Recipe)
+def count_deleted_recipe(sender, instance, **kwargs):
+    counters.change_recipes_count(instance.author_id, -1)
+
+
+@receiver(pre_delete, sender=User)
+def forget_user_activity(sender, instance, **kwargs):
+    for model in (Favorite, ShoppingCart):
+        entries = list(model.objects.filter(user=instance).exclude(
+            recipe__author=instance).values_list('recipe_id', 'created'))
+        popularity.remove_entries(model, entries)
+        counters.change(
+            model, [recipe_id for recipe_id, _ in entries], -1)
+
+
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def bump_ingredients_catalog(sender, **kwargs):
+    catalogs.ingredients.bump()
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def bump_tags_catalog(sender, **kwargs):
+    catalogs.tags.bump()
+
+
+@receiver(post_delete, sender=Recipe)
+@receiver(post_delete, sender=Ingredient)
+def bump_recipe_ingredients_version(sender, **kwargs):
+    versions.recipe_ingredients.bump_on_commit()
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def bump_recipe_tags_version(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        versions.recipe_tags.bump_on_commit()
+
+
+@receiver(post_delete, sender=Tag)
+def bump_recipe_tags_version_on_delete(sender, **kwargs):
+    versions.recipe_tags.bump_on_commit()
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(post_save, sender=CountOfIngredient)
+@receiver(post_delete, sender=CountOfIngredient)
+def invalidate_recipe_counts(sender, **kwargs):
+    counts.invalidate()
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+def invalidate_recipe_fragment(sender, instance, **kwargs):
+    fragments.invalidate([instance.id])
+
+
+@receiver(post_delete, sender=Recipe)
+def add_recipe_tombstone(sender, instance, **kwargs):
+    RecipeTombstone.objects.create(recipe_id=instance.id)
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def invalidate_tagged_recipe_fragments(sender, instance, action, reverse,
+                                       pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        mark_changed([instance.id])
+    elif action == 'pre_clear':
+        mark_changed(
+            list(instance.recipe_set.values_list('id', flat=True)))
+    else:
+        mark_changed(pk_set)
+
+
+@receiver(post_save, sender=CountOfIngredient)
+@receiver(post_delete, sender=CountOfIngredient)
+def invalidate_ingredient_amount_fragment(sender, instance, **kwargs):
+    mark_changed([instance.recipe_id])
+
+
+@receiver(post_save, sender=Tag)
+@receiver(pre_delete, sender=Tag)
+def invalidate_tag_fragments(sender, instance, **kwargs):
+    mark_changed(
+        list(instance.recipe_set.values_list('id', flat=True)))
+
+
+@receiver(post_save, sender=Ingredient)
+def invalidate_ingredient_fragments(sender, instance, created, **kwargs):
+    if not created:
+        mark_changed(list(CountOfIngredient.objects.filter(
+            ingredient=instance).values_list('recipe_id', flat=True)))
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_fragments(sender, instance, created, update_fields,
+                                **kwargs):
+    if created or update_fields == frozenset(('last_login',)):
+        return
+    mark_changed(
+        list(instance.recipes.values_list('id', flat=True)))
+
+
+@receiver(setting_changed)
+def reset_events_broker(setting, **kwargs):
+    if setting == 'EVENTS_BROKER':
+        events.get_broker.cache_clear()
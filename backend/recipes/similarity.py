@@ -0,0 +1,138 @@
+from collections import namedtuple
+
+import numpy as np
+from django.utils import timezone
+from scipy.sparse import csr_matrix, vstack
+
+from . import sync, versions
+from .models import CountOfIngredient, Recipe
+
+MAX_SIMILAR = 50
+# Past this share of changed recipes a full rebuild is cheaper.
+MAX_REFRESH_SHARE = 0.25
+
+Snapshot = namedtuple(
+    'Snapshot', 'since recipe_ids matrix sizes similar')
+
+
+def widen(matrix, width):
+    return csr_matrix((matrix.data, matrix.indices, matrix.indptr),
+                      shape=(matrix.shape[0], width))
+
+
+def get_sharing(matrix, rows):
+    """Return positions of ``matrix`` rows sharing a feature with ``rows``."""
+    return np.flatnonzero(matrix.dot(rows.T).getnnz(axis=1))
+
+
+class SimilarityIndex(versions.VersionedIndex):
+    """Process-local binary recipe feature matrix for recommendations.
+
+    Even columns are the recipe's ingredients and odd ones its tags.
+    Neighbours of a recipe are scored by Jaccard similarity of these feature
+    sets with one sparse matrix-vector product, and the top ``MAX_SIMILAR``
+    of every requested recipe are kept until a change can affect them.
+
+    When the ``recipe_ingredients`` or ``recipe_tags`` version changes, only
+    the rows of recipes modified or deleted since the previous refresh (less
+    ``sync.COMMIT_MARGIN`` for late commits) are reloaded, and only the
+    cached neighbours of recipes sharing a feature with them are dropped.
+    """
+    tracked_versions = (versions.recipe_ingredients, versions.recipe_tags)
+
+    @staticmethod
+    def get_pairs(queryset, *fields):
+        return np.array(
+            queryset.values_list(*fields), dtype=np.int64).reshape(-1, 2)
+
+    @classmethod
+    def get_rows(cls, recipe_ids=None):
+        ingredients = CountOfIngredient.objects.all()
+        tags = Recipe.tags.through.objects.all()
+        if recipe_ids is not None:
+            ingredients = ingredients.filter(recipe_id__in=recipe_ids)
+            tags = tags.filter(recipe_id__in=recipe_ids)
+        ingredients = cls.get_pairs(ingredients, 'recipe_id', 'ingredient_id')
+        tags = cls.get_pairs(tags, 'recipe_id', 'tag_id')
+        recipe_ids, rows = np.unique(
+            np.concatenate((ingredients[:, 0], tags[:, 0])),
+            return_inverse=True)
+        columns = np.concatenate((ingredients[:, 1] * 2, tags[:, 1] * 2 + 1))
+        matrix = csr_matrix(
+            (np.ones(len(rows), dtype=np.int32), (rows, columns)),
+            shape=(len(recipe_ids), columns.max(initial=-1) + 1),
+        )
+        matrix.data[:] = 1
+        return recipe_ids, matrix
+
+    @staticmethod
+    def get_sizes(matrix):
+        return np.asarray(matrix.sum(axis=1)).ravel()
+
+    def build(self):
+        since = timezone.now()
+        recipe_ids, matrix = self.get_rows()
+        return Snapshot(since, recipe_ids, matrix, self.get_sizes(matrix), {})
+
+    def refresh(self, data):
+        since = timezone.now()
+        changed = np.array(
+            sync.get_changed(data.since - sync.COMMIT_MARGIN),
+            dtype=np.int64)
+        if len(changed) > len(data.recipe_ids) * MAX_REFRESH_SHARE:
+            return self.build()
+        new_ids, new_rows = self.get_rows(changed.tolist())
+        width = max(data.matrix.shape[1], new_rows.shape[1])
+        matrix, new_rows = widen(data.matrix, width), widen(new_rows, width)
+        removed = np.isin(data.recipe_ids, changed)
+        affected = np.union1d(
+            data.recipe_ids[get_sharing(matrix, matrix[removed])], changed)
+        recipe_ids = np.concatenate((data.recipe_ids[~removed], new_ids))
+        matrix = vstack((matrix[~removed], new_rows), format='csr')
+        order = np.argsort(recipe_ids, kind='stable')
+        recipe_ids, matrix = recipe_ids[order], matrix[order]
+        affected = set(np.union1d(
+            affected, recipe_ids[get_sharing(matrix, new_rows)]).tolist())
+        similar = {
+            recipe_id: neighbours
+            for recipe_id, neighbours in data.similar.copy().items()
+            if recipe_id not in affected
+        }
+        return Snapshot(since, recipe_ids, matrix, self.get_sizes(matrix),
+                        similar)
+
+    @staticmethod
+    def get_top(data, recipe_id):
+        row = np.searchsorted(data.recipe_ids, recipe_id)
+        if (row == len(data.recipe_ids)
+                or data.recipe_ids[row] != recipe_id):
+            return []
+        overlap = np.asarray(
+            data.matrix.dot(data.matrix[row].T).todense()).ravel()
+        overlap[row] = 0
+        candidates = np.flatnonzero(overlap)
+        scores = overlap[candidates] / (
+            data.sizes[candidates] + data.sizes[row] - overlap[candidates])
+        if len(candidates) > MAX_SIMILAR:
+            top = np.argpartition(-scores, MAX_SIMILAR - 1)[:MAX_SIMILAR]
+            threshold = scores[top].min()
+            top = np.flatnonzero(scores >= threshold)
+            candidates, scores = candidates[top], scores[top]
+        candidates = data.recipe_ids[candidates]
+        order = np.lexsort((-candidates, -scores))[:MAX_SIMILAR]
+        return candidates[order].tolist()
+
+    def similar(self, recipe_id, limit):
+        """Return ids of up to ``limit`` recipes most similar to the given.
+
+        Ties go to newer recipes; recipes sharing nothing are left out.
+        """
+        data = self.get_data()
+        neighbours = data.similar.get(recipe_id)
+        if neighbours is None:
+            neighbours = self.get_top(data, recipe_id)
+            data.similar[recipe_id] = neighbours
+        return neighbours[:limit]
+
+
+similarity_index = SimilarityIndex()
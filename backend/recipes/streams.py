@@ -0,0 +1,127 @@
+import asyncio
+import json
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core import signing
+from rest_framework.authtoken.models import Token
+
+from .events import get_broker
+from .models import User
+
+TICKET_SALT = 'recipes.streams.ticket'
+
+
+def issue_ticket(user_id):
+    """Sign a short-lived ticket that only opens the user's event stream."""
+    return signing.dumps(user_id, salt=TICKET_SALT)
+
+
+def read_ticket(ticket):
+    try:
+        return signing.loads(ticket, salt=TICKET_SALT,
+                             max_age=settings.EVENTS_TICKET_MAX_AGE)
+    except signing.BadSignature:
+        return None
+
+
+@sync_to_async
+def get_user_id(scope):
+    headers = dict(scope['headers'])
+    keyword, _, key = headers.get(
+        b'authorization', b'').decode('latin-1').partition(' ')
+    if keyword == 'Token' and key:
+        return Token.objects.filter(
+            key=key, user__is_active=True).values_list(
+            'user_id', flat=True).first()
+    query = parse_qs(scope['query_string'].decode('latin-1'))
+    ticket = query.get('ticket', [None])[0]
+    user_id = read_ticket(ticket) if ticket else None
+    if user_id is None:
+        return None
+    return User.objects.filter(id=user_id, is_active=True).values_list(
+        'id', flat=True).first()
+
+
+async def send_error(send, status, message):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json')],
+    })
+    await send({
+        'type': 'http.response.body',
+        'body': json.dumps(
+            {'detail': message}, ensure_ascii=False).encode(),
+    })
+
+
+def format_event(event):
+    data = json.dumps(event['data'], ensure_ascii=False)
+    return f'event: {event["type"]}\ndata: {data}\n\n'.encode()
+
+
+async def wait_for_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+async def stream_events(send, queue):
+    while True:
+        try:
+            event = await asyncio.wait_for(
+                queue.get(), settings.EVENTS_HEARTBEAT_INTERVAL)
+        except asyncio.TimeoutError:
+            chunk = b': heartbeat\n\n'
+        else:
+            chunk = format_event(event)
+        await send({
+            'type': 'http.response.body', 'body': chunk, 'more_body': True,
+        })
+
+
+async def events_app(scope, receive, send):
+    """Server-Sent Events stream of the authenticated user's events.
+
+    The token is taken from the ``Authorization: Token <key>`` header.
+    ``EventSource`` clients, which cannot set headers, pass a ticket from
+    ``POST /api/events/ticket/`` as ``?ticket=`` instead, so the token
+    never ends up in access logs.
+    """
+    if scope['method'] != 'GET':
+        await send_error(send, 405, 'Метод не разрешен.')
+        return
+    user_id = await get_user_id(scope)
+    if user_id is None:
+        await send_error(send, 401, 'Учетные данные не были предоставлены.')
+        return
+    broker = get_broker()
+    subscriber = broker.subscribe(user_id)
+    try:
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', b'text/event-stream; charset=utf-8'),
+                (b'cache-control', b'no-cache'),
+                (b'x-accel-buffering', b'no'),
+            ],
+        })
+        await send({
+            'type': 'http.response.body',
+            'body': b': connected\n\n',
+            'more_body': True,
+        })
+        tasks = {
+            asyncio.ensure_future(wait_for_disconnect(receive)),
+            asyncio.ensure_future(stream_events(send, subscriber[1])),
+        }
+        done, pending = await asyncio.wait(
+            tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        for task in done:
+            task.result()
+    finally:
+        broker.unsubscribe(user_id, subscriber)
@@ -0,0 +1,31 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+from .models import Recipe, RecipeTombstone
+
+# Recipe.modified and RecipeTombstone.deleted are set before commit, so a
+# change may become visible later than its timestamp. Readers of changes
+# since a moment look back this far to catch such late commits.
+COMMIT_MARGIN = timedelta(minutes=5)
+
+
+def touch(recipe_ids):
+    """Mark recipes as modified after a change to related objects."""
+    if recipe_ids:
+        Recipe.objects.filter(id__in=recipe_ids).update(
+            modified=timezone.now())
+
+
+def get_changed(since):
+    """Return sorted ids of recipes modified or deleted since a moment."""
+    changed = set(Recipe.objects.filter(
+        modified__gte=since).values_list('id', flat=True))
+    changed.update(RecipeTombstone.objects.filter(
+        deleted__gte=since).values_list('recipe_id', flat=True))
+    return sorted(changed)
+
+
+def get_timestamp():
+    """Return a moment all changes before which are surely committed."""
+    return timezone.now() - COMMIT_MARGIN
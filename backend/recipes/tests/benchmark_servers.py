@@ -0,0 +1,53 @@
+"""WSGI and ASGI entry points of the benchmark, on a throwaway database.
+
+Gunicorn loads ``wsgi_application`` or ``asgi_application`` from here in
+separate processes; ``BENCHMARK_DB`` names the SQLite file filled by
+``seed``.
+"""
+import os
+
+from django.conf import settings
+
+os.environ['DJANGO_SETTINGS_MODULE'] = 'backend.settings'
+settings.DATABASES['default'] = {
+    'ENGINE': 'django.db.backends.sqlite3',
+    'NAME': os.environ['BENCHMARK_DB'],
+}
+settings.DEBUG = False
+
+from backend.asgi import application as asgi_application  # noqa: E402
+from backend.wsgi import application as wsgi_application  # noqa: E402,F401
+
+__all__ = ('asgi_application', 'wsgi_application', 'seed')
+
+
+def seed(recipes=300):
+    from django.core.management import call_command
+
+    from recipes.models import CountOfIngredient, Ingredient, Recipe, Tag
+    from users.models import User
+
+    call_command('migrate', verbosity=0)
+    author = User.objects.create_user(
+        email='author@example.com', username='author', first_name='Имя',
+        last_name='Фамилия', password='password')
+    Tag.objects.bulk_create(
+        Tag(name=f'Тег {index}', color=f'#00000{index}', slug=f'tag{index}')
+        for index in range(3))
+    Ingredient.objects.bulk_create(
+        Ingredient(name=f'Ингредиент {index}', measurement_unit='г')
+        for index in range(50))
+    tags = list(Tag.objects.order_by('id'))
+    ingredients = list(Ingredient.objects.order_by('id'))
+    Recipe.objects.bulk_create(
+        Recipe(name=f'Рецепт {index}', text='Текст', cooking_time=10,
+               author=author, image='recipes/recipe.png')
+        for index in range(recipes))
+    recipe_ids = list(Recipe.objects.values_list('id', flat=True))
+    Recipe.tags.through.objects.bulk_create(
+        Recipe.tags.through(recipe_id=recipe_id, tag_id=tag.id)
+        for recipe_id in recipe_ids for tag in tags[:recipe_id % 3 + 1])
+    CountOfIngredient.objects.bulk_create(
+        CountOfIngredient(recipe_id=recipe_id, amount=10,
+                          ingredient=ingredients[(recipe_id + shift) % 50])
+        for recipe_id in recipe_ids for shift in range(5))
@@ -0,0 +1,80 @@
+import base64
+
+import pytest
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from recipes.models import CountOfIngredient, Ingredient, Recipe, Tag
+from users.models import User
+
+PNG = base64.b64decode(
+    'iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChw'
+    'GA60e6kgAAAABJRU5ErkJggg=='
+)
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(
+        email='user@example.com', username='user', first_name='Имя',
+        last_name='Фамилия', password='password')
+
+
+@pytest.fixture
+def user_client(user):
+    client = APIClient()
+    token = Token.objects.create(user=user)
+    client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+    return client
+
+
+@pytest.fixture
+def tags(db):
+    return [
+        Tag.objects.create(name=f'Тег {index}', color=f'#00000{index}',
+                           slug=f'tag{index}')
+        for index in range(3)
+    ]
+
+
+@pytest.fixture
+def ingredients(db):
+    return [
+        Ingredient.objects.create(name=f'Ингредиент {index}',
+                                  measurement_unit='г')
+        for index in range(10)
+    ]
+
+
+@pytest.fixture
+def make_recipes(db, user, tags, ingredients):
+    def make_recipes(count):
+        recipes = []
+        for index in range(count):
+            recipe = Recipe(name=f'Рецепт {index}', text='Текст',
+                            cooking_time=10, author=user)
+            recipe.image.save('recipe.png', ContentFile(PNG), save=False)
+            recipe.save()
+            recipe.tags.set(tags[:1 + index % len(tags)])
+            CountOfIngredient.objects.bulk_create(
+                CountOfIngredient(recipe=recipe, ingredient=ingredient,
+                                  amount=index + 1)
+                for ingredient in ingredients[index % 5:index % 5 + 3]
+            )
+            recipes.append(recipe)
+        return recipes
+    return make_recipes
@@ -0,0 +1,49 @@
+import asyncio
+import json
+
+import pytest
+from asgiref.testing import ApplicationCommunicator
+from django.urls import resolve
+
+from backend.asgi import ASYNC_URLCONF, application
+
+
+def get(path):
+    communicator = ApplicationCommunicator(application, {
+        'type': 'http', 'method': 'GET', 'path': path, 'query_string': b'',
+        'headers': [], 'scheme': 'http', 'server': ('testserver', 80),
+    })
+
+    async def run():
+        await communicator.send_input({'type': 'http.request'})
+        start = await communicator.receive_output(5)
+        body = await communicator.receive_output(5)
+        return start['status'], json.loads(body['body'])
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize('path, is_async', (
+    ('/api/recipes/', True),
+    ('/api/recipes/1/', True),
+    ('/api/tags/', True),
+    ('/api/recipes/sync/', False),
+    ('/api/users/', False),
+    ('/api/events/ticket/', False),
+))
+def test_asgi_urlconf_makes_only_hot_reads_async(path, is_async):
+    match = resolve(path, ASYNC_URLCONF)
+
+    assert asyncio.iscoroutinefunction(match.func) is is_async
+    assert match.url_name == resolve(path).url_name
+    assert not asyncio.iscoroutinefunction(resolve(path).func)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_asgi_application_serves_async_routes(make_recipes):
+    make_recipes(3)
+
+    status, data = get('/api/recipes/')
+
+    assert status == 200
+    assert data['count'] == 3
@@ -0,0 +1,113 @@
+"""Throughput of the hot read endpoints under WSGI and ASGI.
+
+Both servers run gunicorn with the same number of worker processes: sync
+workers on ``backend.wsgi`` and uvicorn workers on ``backend.asgi``. Run
+with ``pytest -m benchmark``; gunicorn and uvicorn must be installed.
+
+The benchmark reports rather than asserts: which server wins depends on
+the database latency and the number of cores. On SQLite and one core,
+WSGI served about 130-150 requests/s and ASGI about 75-95.
+"""
+import os
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import cycle, islice
+from urllib.request import urlopen
+
+import pytest
+
+WORKERS = 2
+CONCURRENCY = 16
+REQUESTS = 2000
+URLS = (
+    '/api/recipes/?limit=6',
+    '/api/recipes/?limit=6&tags=tag1',
+    '/api/recipes/1/',
+    '/api/tags/',
+    '/api/ingredients/?name=%D0%B8%D0%BD%D0%B3',
+)
+# gunicorn 20.0 has no __main__ module.
+GUNICORN = 'from gunicorn.app.wsgiapp import run; run()'
+SERVERS = {
+    'wsgi': ('recipes.tests.benchmark_servers:wsgi_application',),
+    'asgi': ('recipes.tests.benchmark_servers:asgi_application',
+             '--worker-class', 'uvicorn.workers.UvicornWorker'),
+}
+
+
+def get_free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(server, url, timeout=30):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with urlopen(url) as response:
+                return response.read()
+        except OSError:
+            if server.poll() is not None or time.monotonic() > deadline:
+                raise
+            time.sleep(0.2)
+
+
+def fetch(url):
+    with urlopen(url) as response:
+        assert response.status == 200
+        return response.read()
+
+
+def measure(base_url):
+    """Requests per second of ``REQUESTS`` reads at ``CONCURRENCY``."""
+    urls = [base_url + path for path in islice(cycle(URLS), REQUESTS)]
+    with ThreadPoolExecutor(CONCURRENCY) as executor:
+        list(executor.map(fetch, urls[:CONCURRENCY * 5]))
+        start = time.perf_counter()
+        list(executor.map(fetch, urls))
+        return REQUESTS / (time.perf_counter() - start)
+
+
+@pytest.fixture(scope='module')
+def environment(tmp_path_factory):
+    env = dict(os.environ, BENCHMARK_DB=str(
+        tmp_path_factory.mktemp('benchmark') / 'db.sqlite3'))
+    subprocess.run(
+        [sys.executable, '-c',
+         'from recipes.tests import benchmark_servers; '
+         'benchmark_servers.seed()'],
+        env=env, check=True)
+    return env
+
+
+def run_server(environment, kind):
+    port = get_free_port()
+    server = subprocess.Popen(
+        [sys.executable, '-c', GUNICORN, *SERVERS[kind],
+         '--workers', str(WORKERS), '--bind', f'127.0.0.1:{port}',
+         '--log-level', 'warning'],
+        env=environment)
+    base_url = f'http://127.0.0.1:{port}'
+    try:
+        wait_for(server, base_url + URLS[0])
+        return measure(base_url)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+@pytest.mark.benchmark
+def test_read_throughput_under_wsgi_and_asgi(environment, capsys,
+                                             record_property):
+    results = {kind: run_server(environment, kind) for kind in SERVERS}
+
+    for kind, rate in results.items():
+        record_property(f'{kind}_requests_per_second', rate)
+    with capsys.disabled():
+        sys.stdout.write(''.join(
+            f'\n{kind}: {rate:.0f} requests/s with {WORKERS} workers'
+            for kind, rate in results.items()) + '\n')
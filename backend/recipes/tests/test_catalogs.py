@@ -0,0 +1,23 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+from recipes.models import CatalogVersion, Tag
+
+
+def test_catalog_conditional_get_sees_new_tags(client, tags, settings):
+    settings.CATALOG_VERSION_TTL = -1
+    CatalogVersion.objects.filter(name='tags').update(
+        modified=timezone.now() - timedelta(hours=1))
+    old = client.get('/api/tags/')
+
+    Tag.objects.create(name='Новый тег', color='#FFFFFF', slug='new')
+    response = client.get(
+        '/api/tags/', HTTP_IF_MODIFIED_SINCE=old['Last-Modified'])
+
+    assert response.status_code == 200
+    assert response['Last-Modified'] != old['Last-Modified']
+    assert len(response.json()) == len(tags) + 1
+    assert client.get(
+        '/api/tags/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+    ).status_code == 304
@@ -0,0 +1,61 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from recipes import counters
+from recipes.models import Favorite, Recipe, ShoppingListVersion
+from recipes.views import RecipeViewSet
+from users.models import User
+
+
+def test_counters_do_not_go_below_zero(user, make_recipes):
+    recipe = make_recipes(1)[0]
+    Recipe.objects.filter(id=recipe.id).update(favorites_count=0)
+    User.objects.filter(id=user.id).update(recipes_count=0)
+
+    counters.change(Favorite, [recipe.id], -1)
+    counters.change_recipes_count(user.id, -1)
+
+    assert Recipe.objects.get(id=recipe.id).favorites_count == 0
+    assert User.objects.get(id=user.id).recipes_count == 0
+
+
+def test_repeated_favorite_is_rejected(user_client, make_recipes):
+    recipe = make_recipes(1)[0]
+    url = f'/api/recipes/{recipe.id}/favorite/'
+
+    assert user_client.post(url).status_code == 201
+    assert user_client.post(url).status_code == 400
+    assert Recipe.objects.get(id=recipe.id).favorites_count == 1
+
+
+def test_favorite_does_not_lock_shopping_list(user_client, make_recipes):
+    recipe = make_recipes(1)[0]
+
+    with CaptureQueriesContext(connection) as context:
+        response = user_client.post(f'/api/recipes/{recipe.id}/favorite/')
+
+    assert response.status_code == 201
+    assert not ShoppingListVersion.objects.exists()
+    assert not any('shoppinglistversion' in query['sql']
+                   for query in context.captured_queries)
+
+
+def test_bulk_favorite_counts_only_inserted_rows(
+        user, user_client, make_recipes, monkeypatch):
+    first, second = make_recipes(2)
+    Favorite.objects.create(user=user, recipe=first)
+    Recipe.objects.filter(id=first.id).update(favorites_count=1)
+
+    def get_stale_state(request, model):
+        return [], [first.id, second.id], []
+
+    monkeypatch.setattr(RecipeViewSet, 'get_bulk_state',
+                        staticmethod(get_stale_state))
+    response = user_client.post('/api/recipes/bulk_favorite/',
+                                {'recipes': [first.id, second.id]},
+                                format='json')
+
+    assert response.json()['added'] == [second.id]
+    assert response.json()['skipped'] == [first.id]
+    assert Recipe.objects.get(id=first.id).favorites_count == 1
+    assert Recipe.objects.get(id=second.id).favorites_count == 1
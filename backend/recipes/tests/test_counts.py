@@ -0,0 +1,26 @@
+from recipes import counts
+
+
+def get_generations(user):
+    return (
+        counts.get_generation(counts.GENERATION_KEY),
+        counts.get_generation(
+            counts.USER_GENERATION_KEY.format(user_id=user.id)),
+    )
+
+
+def test_count_generations_move_on_commit(
+        user_client, user, make_recipes, django_capture_on_commit_callbacks):
+    recipe = make_recipes(1)[0]
+    before = get_generations(user)
+
+    with django_capture_on_commit_callbacks() as callbacks:
+        user_client.post(f'/api/recipes/{recipe.id}/favorite/')
+        recipe.name = 'Новое название'
+        recipe.save()
+    assert get_generations(user) == before
+
+    for callback in callbacks:
+        callback()
+    after = get_generations(user)
+    assert after[0] != before[0] and after[1] != before[1]
@@ -0,0 +1,93 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from recipes import filters, versions
+from recipes.models import CatalogVersion, CountOfIngredient, Recipe
+from recipes.search import RecipeIngredientIndex
+
+
+def get_ids(client, query):
+    response = client.get(f'/api/recipes/?limit=100&{query}')
+    assert response.status_code == 200
+    return sorted(recipe['id'] for recipe in response.json()['results'])
+
+
+def get_version():
+    version = CatalogVersion.objects.filter(
+        name='recipe_ingredients').first()
+    return version.version if version else 0
+
+
+@pytest.mark.parametrize('query', [
+    'ingredients={0}&ingredients={2}',
+    'ingredients={2}&exclude_ingredients={0}',
+    'exclude_ingredients={1}&exclude_ingredients={6}',
+])
+def test_ingredient_filter_falls_back_to_subqueries(
+        client, make_recipes, ingredients, monkeypatch, query):
+    make_recipes(10)
+    query = query.format(*(ingredient.id for ingredient in ingredients))
+    expected = get_ids(client, query)
+
+    monkeypatch.setattr(filters, 'MAX_RECIPE_IDS', 0)
+
+    assert expected
+    assert get_ids(client, query) == expected
+
+
+def test_recipe_ingredients_version_bumps_only_on_ingredient_changes(
+        user_client, make_recipes, ingredients,
+        django_capture_on_commit_callbacks):
+    recipe = make_recipes(1)[0]
+    url = f'/api/recipes/{recipe.id}/'
+    data = {
+        'ingredients': [
+            {'id': ingredient.id, 'amount': 5}
+            for ingredient in ingredients[:3]
+        ],
+        'tags': list(recipe.tags.values_list('id', flat=True)),
+        'name': 'Новое название', 'text': 'Текст', 'cooking_time': 5,
+    }
+    version = get_version()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = user_client.patch(url, data, format='json')
+    assert response.status_code == 200
+    assert get_version() == version
+
+    data['ingredients'][0]['id'] = ingredients[5].id
+    with django_capture_on_commit_callbacks(execute=True):
+        response = user_client.patch(url, data, format='json')
+    assert response.status_code == 200
+    assert get_version() == version + 1
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Recipe.objects.get(id=recipe.id).delete()
+    assert get_version() == version + 2
+
+
+def test_recipe_ingredient_index_applies_changed_recipes(
+        make_recipes, ingredients, monkeypatch,
+        django_capture_on_commit_callbacks):
+    recipes = make_recipes(10)
+    Recipe.objects.update(modified=timezone.now() - timedelta(days=1))
+    index = RecipeIngredientIndex()
+    first, second = ingredients[0].id, ingredients[1].id
+    assert index.contains_all([first]) == [recipes[0].id, recipes[5].id]
+
+    def fail():
+        raise AssertionError('full rebuild')
+
+    monkeypatch.setattr(index, 'build', fail)
+    with django_capture_on_commit_callbacks(execute=True):
+        Recipe.objects.get(id=recipes[5].id).delete()
+        CountOfIngredient.objects.create(
+            recipe=recipes[3], ingredient=ingredients[0], amount=1)
+        versions.recipe_ingredients.bump_on_commit()
+
+    assert index.contains_all([first]) == [recipes[0].id, recipes[3].id]
+    assert index.contains_all([first], [second]) == [recipes[3].id]
+    assert recipes[5].id not in index.contains_any(
+        [ingredient.id for ingredient in ingredients])
@@ -0,0 +1,64 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from recipes import popularity
+from recipes.models import Favorite, Recipe
+
+
+def get_popularity(recipe):
+    return Recipe.objects.get(id=recipe.id).popularity
+
+
+def test_added_entries_are_scored_by_their_created(
+        user_client, make_recipes, monkeypatch):
+    first, second = make_recipes(2)
+    later = timezone.now() + timedelta(days=30)
+    monkeypatch.setattr(timezone, 'now', lambda: later)
+
+    user_client.post(f'/api/recipes/{first.id}/favorite/')
+    user_client.post('/api/recipes/bulk_favorite/',
+                     {'recipes': [second.id]}, format='json')
+
+    for recipe in (first, second):
+        entry = Favorite.objects.get(recipe=recipe)
+        assert entry.created == later
+        assert get_popularity(recipe) == pytest.approx(
+            popularity.get_score(Favorite, later))
+    user_client.delete(f'/api/recipes/{first.id}/favorite/')
+    assert get_popularity(first) == pytest.approx(0, abs=1e-9)
+
+
+@pytest.mark.parametrize('ordering, field', (
+    ('favorites', 'favorites_count'),
+    ('popular', 'popularity'),
+))
+def test_cursor_pages_follow_requested_ordering(
+        client, make_recipes, ordering, field):
+    recipes = make_recipes(7)
+    for index, recipe in enumerate(recipes):
+        Recipe.objects.filter(id=recipe.id).update(**{field: index % 3})
+    expected = list(Recipe.objects.order_by(
+        f'-{field}', '-id').values_list('id', flat=True))
+
+    ids = []
+    url = f'/api/recipes/?paginate=cursor&limit=2&ordering={ordering}'
+    while url:
+        data = client.get(url).json()
+        ids.extend(recipe['id'] for recipe in data['results'])
+        url = data['next']
+
+    assert ids == expected
+
+
+def test_epoch_check_warns_before_scores_overflow(settings):
+    assert popularity.check_epoch(None) == []
+
+    settings.POPULARITY_EPOCH = timezone.now() - timedelta(
+        seconds=settings.POPULARITY_HALF_LIFE * (
+            popularity.MAX_HALF_LIVES - 10))
+
+    warnings = popularity.check_epoch(None)
+    assert [warning.id for warning in warnings] == ['recipes.W001']
+    assert popularity.get_score(Favorite, timezone.now()) > 0
@@ -0,0 +1,24 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+RECIPE_PAGE_QUERIES = 7
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(context.captured_queries), response.json()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('limit', (2, 10))
+def test_recipe_page_query_count_is_constant(user_client, make_recipes,
+                                             limit):
+    make_recipes(12)
+
+    queries, data = count_queries(user_client, f'/api/recipes/?limit={limit}')
+
+    assert len(data['results']) == limit
+    assert queries == RECIPE_PAGE_QUERIES
@@ -0,0 +1,59 @@
+import pytest
+from django.test import Client
+
+from recipes.models import CountOfIngredient
+from users.models import User
+
+
+@pytest.fixture
+def admin_client(db):
+    admin = User.objects.create_superuser(
+        email='admin@example.com', username='admin', first_name='Имя',
+        last_name='Фамилия', password='password')
+    client = Client()
+    client.force_login(admin)
+    return client
+
+
+def get_amounts(client):
+    response = client.get('/api/recipes/shopping_list/')
+    assert response.status_code == 200
+    return {item['name']: item['amount'] for item in response.json()}
+
+
+def test_admin_amount_changes_update_shopping_list(
+        user_client, admin_client, make_recipes):
+    recipe, = make_recipes(1)
+    user_client.post(f'/api/recipes/{recipe.id}/shopping_cart/')
+    item = CountOfIngredient.objects.filter(recipe=recipe).first()
+    name = item.ingredient.name
+
+    response = admin_client.post(
+        f'/admin/recipes/countofingredient/{item.id}/change/',
+        {'recipe': recipe.id, 'ingredient': item.ingredient_id,
+         'amount': 100})
+    assert response.status_code == 302
+    assert get_amounts(user_client)[name] == 100
+
+    response = admin_client.post(
+        f'/admin/recipes/countofingredient/{item.id}/delete/',
+        {'post': 'yes'})
+    assert response.status_code == 302
+    assert name not in get_amounts(user_client)
+
+
+def test_bulk_add_skips_recipes_already_in_cart(user_client, make_recipes):
+    first, second = make_recipes(2)
+    user_client.post(f'/api/recipes/{first.id}/shopping_cart/')
+    amounts = get_amounts(user_client)
+
+    response = user_client.post(
+        '/api/recipes/bulk_shopping_cart/',
+        {'recipes': [first.id, second.id]}, format='json')
+
+    assert response.json()['added'] == [second.id]
+    assert response.json()['skipped'] == [first.id]
+    for item in CountOfIngredient.objects.filter(recipe=second):
+        amounts[item.ingredient.name] = (
+            amounts.get(item.ingredient.name, 0) + item.amount)
+    assert get_amounts(user_client) == amounts
@@ -0,0 +1,70 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from recipes import versions
+from recipes.models import CountOfIngredient, Ingredient, Recipe
+from recipes.similarity import SimilarityIndex
+
+
+@pytest.fixture
+def recipes(make_recipes):
+    return make_recipes(12)
+
+
+@pytest.fixture
+def index(recipes, monkeypatch):
+    Recipe.objects.update(modified=timezone.now() - timedelta(days=1))
+    index = SimilarityIndex()
+    build = index.build
+
+    def build_once():
+        monkeypatch.setattr(index, 'build', fail)
+        return build()
+
+    def fail():
+        raise AssertionError('full rebuild')
+
+    monkeypatch.setattr(index, 'build', build_once)
+    return index
+
+
+def test_similarity_refreshes_changed_recipes_only(
+        recipes, tags, index, django_capture_on_commit_callbacks):
+    first, changed, deleted = recipes[0], recipes[1], recipes[5]
+    before = index.similar(first.id, 20)
+    assert changed.id in before and deleted.id in before
+
+    with django_capture_on_commit_callbacks(execute=True):
+        changed.tags.set(tags[2:])
+        CountOfIngredient.objects.filter(recipe=changed).delete()
+        deleted.delete()
+    after = index.similar(first.id, 20)
+
+    assert changed.id not in after
+    assert deleted.id not in after
+    assert index.similar(changed.id, 20) == [
+        recipe.id for recipe in reversed(recipes)
+        if recipe.id not in (changed.id, deleted.id)
+        and recipe.tags.filter(id=tags[2].id).exists()
+    ]
+
+
+def test_similarity_keeps_neighbours_of_unrelated_recipes(
+        recipes, user, index, django_capture_on_commit_callbacks):
+    first = recipes[0]
+    neighbours = index.similar(first.id, 6)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        recipe = Recipe.objects.create(
+            name='Другой рецепт', text='Текст', cooking_time=10,
+            author=user, image='recipes/recipe.png')
+        CountOfIngredient.objects.create(
+            recipe=recipe, amount=1, ingredient=Ingredient.objects.create(
+                name='Другой ингредиент', measurement_unit='г'))
+        versions.recipe_ingredients.bump_on_commit()
+
+    assert index.similar(recipe.id, 6) == []
+    assert index.get_data().similar.keys() == {first.id, recipe.id}
+    assert index.similar(first.id, 6) == neighbours
@@ -0,0 +1,73 @@
+from asgiref.sync import async_to_sync, sync_to_async
+from asgiref.testing import ApplicationCommunicator
+from rest_framework.authtoken.models import Token
+
+from recipes import streams
+
+
+def make_scope(query='', headers=()):
+    return {'headers': list(headers), 'query_string': query.encode()}
+
+
+def get_user_id(scope):
+    return async_to_sync(streams.get_user_id)(scope)
+
+
+def test_event_stream_accepts_a_ticket(user, user_client):
+    response = user_client.post('/api/events/ticket/')
+
+    assert response.status_code == 201
+    ticket = response.json()['ticket']
+    assert get_user_id(make_scope(f'ticket={ticket}')) == user.id
+
+
+def test_event_stream_rejects_expired_tickets_and_query_tokens(
+        user, settings):
+    token = Token.objects.create(user=user)
+    ticket = streams.issue_ticket(user.id)
+    settings.EVENTS_TICKET_MAX_AGE = -1
+
+    assert get_user_id(make_scope(f'ticket={ticket}')) is None
+    assert get_user_id(make_scope(f'token={token.key}')) is None
+    assert get_user_id(make_scope(headers=[
+        (b'authorization', f'Token {token.key}'.encode())])) == user.id
+
+
+def test_event_ticket_requires_authentication(client):
+    assert client.post('/api/events/ticket/').status_code == 401
+
+
+def test_event_stream_sends_favorite_changes(
+        user, user_client, make_recipes, settings,
+        django_capture_on_commit_callbacks):
+    settings.EVENTS_BROKER = 'recipes.events.InMemoryBroker'
+    recipe = make_recipes(1)[0]
+    token = Token.objects.get(user=user)
+
+    @sync_to_async
+    def add_favorite():
+        with django_capture_on_commit_callbacks(execute=True):
+            response = user_client.post(f'/api/recipes/{recipe.id}/favorite/')
+        assert response.status_code == 201
+
+    async def read_stream():
+        communicator = ApplicationCommunicator(streams.events_app, {
+            'type': 'http', 'method': 'GET', 'path': '/api/events/',
+            'query_string': b'',
+            'headers': [(b'authorization', f'Token {token.key}'.encode())],
+        })
+        start = await communicator.receive_output()
+        connected = await communicator.receive_output()
+        await add_favorite()
+        event = await communicator.receive_output()
+        await communicator.send_input({'type': 'http.disconnect'})
+        await communicator.wait()
+        return start, connected, event
+
+    start, connected, event = async_to_sync(read_stream)()
+
+    assert start['status'] == 200
+    assert connected['body'] == b': connected\n\n'
+    assert event['body'] == (
+        f'event: favorites_changed\ndata: {{"added": [{recipe.id}]}}\n\n'
+    ).encode()
@@ -0,0 +1,36 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+from recipes import sync
+from recipes.models import Recipe
+
+
+def test_sync_pages_changes_and_lists_deleted_once(client, make_recipes):
+    recipes = make_recipes(5)
+    since = (timezone.now() - timedelta(days=1)).isoformat()
+    deleted = recipes.pop()
+    Recipe.objects.get(id=deleted.id).delete()
+
+    pages = [client.get('/api/recipes/sync/', {
+        'limit': 2, 'updated_since': since}).json()]
+    while pages[-1]['next']:
+        pages.append(client.get(pages[-1]['next']).json())
+
+    assert [recipe['id'] for page in pages for recipe in page['results']] \
+        == [recipe.id for recipe in recipes]
+    assert pages[0]['deleted'] == [deleted.id]
+    assert all('deleted' not in page for page in pages[1:])
+
+
+def test_sync_timestamp_leaves_room_for_late_commits(client, make_recipes):
+    make_recipes(1)
+    before = timezone.now()
+    since = (before - timedelta(days=1)).isoformat()
+
+    response = client.get('/api/recipes/sync/', {'updated_since': since})
+
+    timestamp = response.json()['timestamp']
+    assert response.status_code == 200
+    assert timestamp <= (before - sync.COMMIT_MARGIN
+                         + timedelta(seconds=1)).isoformat()
@@ -0,0 +1,87 @@
+import time
+from statistics import median
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from recipes.models import Recipe
+
+TAG_FILTER_URL = '/api/recipes/?tags=tag0&tags=tag1&limit=6'
+REPEAT = 20
+
+
+def add_recipes(author, tags, count):
+    recipes = Recipe.objects.bulk_create(
+        Recipe(name=f'Рецепт {index}', text='Текст', cooking_time=10,
+               author=author, image='recipes/recipe.png')
+        for index in range(count)
+    )
+    if not recipes[0].id:
+        recipes = Recipe.objects.order_by('-id')[:count]
+    Recipe.tags.through.objects.bulk_create(
+        Recipe.tags.through(recipe_id=recipe.id, tag_id=tag.id)
+        for recipe in recipes for tag in tags
+    )
+
+
+def count_queries(client):
+    """SQL of an uncached filtered page once catalog versions are read."""
+    client.get(TAG_FILTER_URL)
+    cache.clear()
+    with CaptureQueriesContext(connection) as context:
+        client.get(TAG_FILTER_URL)
+    return [query['sql'] for query in context.captured_queries]
+
+
+def measure(client):
+    """Median time of an uncached filtered page."""
+    timings = []
+    for _ in range(REPEAT):
+        cache.clear()
+        start = time.perf_counter()
+        response = client.get(TAG_FILTER_URL)
+        timings.append(time.perf_counter() - start)
+        assert response.status_code == 200
+    return median(timings)
+
+
+def test_tag_filter_returns_each_recipe_once(client, make_recipes):
+    make_recipes(6)
+
+    response = client.get('/api/recipes/?tags=tag0&tags=tag1&tags=tag2')
+
+    ids = [recipe['id'] for recipe in response.json()['results']]
+    assert response.json()['count'] == 6
+    assert len(ids) == len(set(ids))
+
+
+def test_tag_filter_rejects_unknown_slug(client, tags):
+    response = client.get('/api/recipes/?tags=unknown')
+
+    assert response.status_code == 400
+
+
+def test_tag_filter_queries_stay_flat_as_recipes_grow(client, user, tags):
+    add_recipes(user, tags[:2], 50)
+    small_queries = count_queries(client)
+    add_recipes(user, tags[:2], 2000)
+    large_queries = count_queries(client)
+
+    assert len(large_queries) == len(small_queries)
+    recipe_queries = [sql for sql in large_queries
+                      if 'FROM "recipes_recipe" WHERE' in sql]
+    assert recipe_queries
+    assert all('EXISTS' in sql and 'DISTINCT' not in sql
+               for sql in recipe_queries)
+
+
+@pytest.mark.benchmark
+def test_tag_filter_time_stays_flat_as_recipes_grow(client, user, tags):
+    add_recipes(user, tags[:2], 50)
+    small_time = measure(client)
+    add_recipes(user, tags[:2], 2000)
+    large_time = measure(client)
+
+    assert large_time < small_time * 3
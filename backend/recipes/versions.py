@@ -0,0 +1,84 @@
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import CatalogVersion
+
+
+class Version:
+    """Named version counter shared by all processes.
+
+    The version lives in ``CatalogVersion`` so every process and the
+    management commands agree on it. Each process re-reads it at most once
+    per ``CATALOG_VERSION_TTL`` seconds.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._version = None
+        self._checked = None
+
+    def get_version(self):
+        now = time.monotonic()
+        if (self._version is None
+                or now - self._checked > settings.CATALOG_VERSION_TTL):
+            catalog, _ = CatalogVersion.objects.get_or_create(name=self.name)
+            self._version = (catalog.version, catalog.modified)
+            self._checked = now
+        return self._version
+
+    def bump(self):
+        # update() skips auto_now, so the modification time is set here.
+        updated = CatalogVersion.objects.filter(name=self.name).update(
+            version=F('version') + 1, modified=timezone.now())
+        if not updated:
+            CatalogVersion.objects.get_or_create(
+                name=self.name, defaults={'version': 1})
+        self._version = None
+
+    def bump_on_commit(self):
+        """Bump after commit, without holding the row lock meanwhile."""
+        transaction.on_commit(self.bump)
+
+
+class VersionedIndex:
+    """Process-local data derived from tables tracked by versions.
+
+    The data is built on first use and brought up to date when any of
+    ``tracked_versions`` changes. Concurrent requests wait for one rebuild
+    instead of each running their own. Subclasses implement ``build`` and,
+    if they can apply changes incrementally, ``refresh``.
+    """
+    tracked_versions = ()
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = None
+
+    def build(self):
+        raise NotImplementedError
+
+    def refresh(self, data):
+        """Return ``data`` of an older version brought up to date."""
+        return self.build()
+
+    def get_data(self):
+        version = tuple(
+            tracked.get_version()[0] for tracked in self.tracked_versions)
+        data = self._data
+        if data is None or data[0] != version:
+            with self._lock:
+                data = self._data
+                if data is None:
+                    data = self._data = (version, self.build())
+                elif data[0] != version:
+                    data = self._data = (version, self.refresh(data[1]))
+        return data[1]
+
+
+recipe_ingredients = Version('recipe_ingredients')
+recipe_tags = Version('recipe_tags')
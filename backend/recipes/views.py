@@ -1,76 +1,163 @@
-from django.db.models import Sum
-from django.http import HttpResponse
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework.backends import DjangoFilterBackend
 from rest_framework import status
 from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework.viewsets import ModelViewSet, ReadOnlyModelViewSet
 
-from backend.pagination import LimitPageNumberPagination
+from backend.pagination import (CursorPaginationMixin, FeedCursorPagination,
+                                LimitPageNumberPagination,
+                                SyncCursorPagination)
 from backend.permissions import IsAuthorOrAdminOrReadOnly
 
-from .filters import IngredientSearchFilter, RecipeFilter
-from .models import (CountOfIngredient, Favorite, Ingredient, Recipe,
-                     ShoppingCart, Tag)
-from .serializers import (FavoriteSerializer, IngredientSerializer,
-                          RecipeReadSerializer, RecipeSerializer,
-                          ShoppingCartSerializer, TagSerializer)
+from . import (catalogs, counters, counts, events, popularity,
+               shopping_lists, streams, sync)
+from .filters import ORDERING_FIELDS, RecipeFilter
+from .models import (Favorite, FeedEntry, Ingredient, Recipe,
+                     RecipeTombstone, ShoppingCart, ShoppingListItem, Tag)
+from .pantry import pantry_index
+from .renderers import (CSVShoppingListRenderer, PDFShoppingListRenderer,
+                        TextShoppingListRenderer)
+from .search import ingredient_index
+from .serializers import (IngredientSerializer, PantrySerializer,
+                          RecipeIdsSerializer, RecipeReadSerializer,
+                          RecipeSerializer, RepresentationSerializer,
+                          ShoppingListItemSerializer,
+                          SimilarRecipesSerializer, SyncSerializer,
+                          TagSerializer)
+from .similarity import similarity_index
+
+DOWNLOAD_CHUNK_SIZE = 8192
+EVENT_TYPES = {
+    Favorite: 'favorites_changed',
+    ShoppingCart: 'shopping_cart_changed',
+}
 
 
 class TagViewSet(ReadOnlyModelViewSet):
     serializer_class = TagSerializer
     queryset = Tag.objects.all()
+    authentication_classes = ()
     permission_classes = (AllowAny,)
 
+    def list(self, request, *args, **kwargs):
+        return catalogs.tags.get_response(request)
+
 
 class IngredientViewSet(ReadOnlyModelViewSet):
     serializer_class = IngredientSerializer
-    filter_backends = (IngredientSearchFilter,)
     queryset = Ingredient.objects.all()
+    authentication_classes = ()
     permission_classes = (AllowAny,)
-    search_fields = ('^name',)
+
+    def list(self, request, *args, **kwargs):
+        name = request.query_params.get('name')
+        if name is None:
+            return catalogs.ingredients.get_response(request)
+        limit = request.query_params.get('limit', '')
+        limit = int(limit) if limit.isdigit() else None
+        return Response(ingredient_index.search(name, limit))
 
 
-class RecipeViewSet(ModelViewSet):
+class RecipeViewSet(CursorPaginationMixin, ModelViewSet):
     pagination_class = LimitPageNumberPagination
     permission_classes = (IsAuthorOrAdminOrReadOnly,)
     filter_backends = (DjangoFilterBackend,)
     filterset_class = RecipeFilter
-    queryset = Recipe.objects.all()
+
+    def get_queryset(self):
+        return Recipe.objects.with_user_flags(self.request.user)
+
+    def get_cursor_ordering(self):
+        ordering = ORDERING_FIELDS.get(
+            self.request.query_params.get('ordering'))
+        if ordering is None:
+            return super().get_cursor_ordering()
+        return (ordering, '-id')
 
     def get_serializer_class(self):
         if self.action in ('list', 'retrieve'):
             return RecipeReadSerializer
         return RecipeSerializer
 
+    def get_count_cache_key(self):
+        return counts.get_cache_key(self.request)
+
     @staticmethod
-    def post_method_for_action(request, pk, serializers):
-        data = {'user': request.user.id, 'recipe': pk}
-        serializer = serializers(data=data, context={'request': request})
-        serializer.is_valid(raise_exception=True)
-        serializer.save()
+    def on_recipes_added(user, model, entries):
+        recipe_ids = [recipe_id for recipe_id, _ in entries]
+        if model is ShoppingCart:
+            shopping_lists.add_recipes(user, recipe_ids)
+        popularity.add_entries(model, entries)
+        counters.change(model, recipe_ids, 1)
+        if recipe_ids:
+            events.publish(
+                [user.id], EVENT_TYPES[model], {'added': recipe_ids})
+        counts.invalidate_user(user)
+
+    @staticmethod
+    def on_recipes_removed(user, model, entries):
+        recipe_ids = [recipe_id for recipe_id, _ in entries]
+        if model is ShoppingCart:
+            shopping_lists.remove_recipes(user, recipe_ids)
+        popularity.remove_entries(model, entries)
+        counters.change(model, recipe_ids, -1)
+        if recipe_ids:
+            events.publish(
+                [user.id], EVENT_TYPES[model], {'removed': recipe_ids})
+        counts.invalidate_user(user)
+
+    @staticmethod
+    def get_entries(user, model, recipe_ids):
+        return list(model.objects.select_for_update().filter(
+            user=user, recipe_id__in=recipe_ids
+        ).values_list('recipe_id', 'created'))
+
+    def post_method_for_action(self, request, pk, model):
+        recipe = get_object_or_404(
+            Recipe.objects.only('id', 'name', 'image', 'cooking_time'), id=pk)
+        with transaction.atomic():
+            if model is ShoppingCart:
+                shopping_lists.lock_users([request.user.id])
+            try:
+                with transaction.atomic():
+                    entry = model.objects.create(
+                        user=request.user, recipe=recipe)
+            except IntegrityError:
+                return Response({'errors': 'Рецепт уже добавлен'},
+                                status=status.HTTP_400_BAD_REQUEST)
+            self.on_recipes_added(
+                request.user, model, [(recipe.id, entry.created)])
+        serializer = RepresentationSerializer(
+            recipe, context={'request': request})
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     @action(methods=['POST'], detail=True,
             permission_classes=[IsAuthenticated])
     def favorite(self, request, pk):
         return self.post_method_for_action(request=request, pk=pk,
-                                           serializers=FavoriteSerializer)
+                                           model=Favorite)
 
     @action(methods=['POST'], detail=True,
             permission_classes=[IsAuthenticated])
     def shopping_cart(self, request, pk):
         return self.post_method_for_action(request=request, pk=pk,
-                                           serializers=ShoppingCartSerializer)
+                                           model=ShoppingCart)
 
-    @staticmethod
-    def delete_method_for_actions(request, pk, model):
-        user = request.user
-        recipe = get_object_or_404(Recipe, id=pk)
-        model_object = get_object_or_404(model, user=user, recipe=recipe)
-        model_object.delete()
+    @transaction.atomic
+    def delete_method_for_actions(self, request, pk, model):
+        entries = self.get_entries(request.user, model, [pk])
+        if not entries:
+            raise Http404
+        model.objects.filter(user=request.user, recipe_id=pk).delete()
+        self.on_recipes_removed(request.user, model, entries)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     @favorite.mapping.delete
@@ -79,22 +166,198 @@ class RecipeViewSet(ModelViewSet):
             request=request, pk=pk, model=Favorite
         )
 
+    @staticmethod
+    def get_bulk_state(request, model):
+        serializer = RecipeIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        recipe_ids = list(dict.fromkeys(
+            serializer.validated_data['recipes']))
+        found = dict(Recipe.objects.filter(id__in=recipe_ids).annotate(
+            is_added=Exists(model.objects.filter(
+                user=request.user, recipe=OuterRef('pk')))
+        ).values_list('id', 'is_added'))
+        not_found = [pk for pk in recipe_ids if pk not in found]
+        present = [pk for pk in recipe_ids if found.get(pk)]
+        absent = [pk for pk in recipe_ids if found.get(pk) is False]
+        return present, absent, not_found
+
+    @staticmethod
+    def insert_entries(user, model, recipe_ids):
+        """Insert entries skipping existing ones and return inserted ones.
+
+        Each row gets its own ``created`` on insert, so rows still carrying
+        it afterwards are the ones this call inserted, not concurrent ones.
+        """
+        entries = {
+            (entry.recipe_id, entry.created)
+            for entry in model.objects.bulk_create(
+                (model(user=user, recipe_id=pk) for pk in recipe_ids),
+                ignore_conflicts=True)
+        }
+        return [
+            entry for entry in model.objects.filter(
+                user=user, recipe_id__in=recipe_ids
+            ).values_list('recipe_id', 'created')
+            if entry in entries
+        ]
+
+    @transaction.atomic
+    def bulk_post_method_for_action(self, request, model):
+        if model is ShoppingCart:
+            shopping_lists.lock_users([request.user.id])
+        present, absent, not_found = self.get_bulk_state(request, model)
+        entries = self.insert_entries(request.user, model, absent)
+        self.on_recipes_added(request.user, model, entries)
+        added = {recipe_id for recipe_id, _ in entries}
+        return Response({
+            'added': [pk for pk in absent if pk in added],
+            'skipped': present + [pk for pk in absent if pk not in added],
+            'not_found': not_found,
+        })
+
+    @transaction.atomic
+    def bulk_delete_method_for_actions(self, request, model):
+        present, absent, not_found = self.get_bulk_state(request, model)
+        entries = self.get_entries(request.user, model, present)
+        model.objects.filter(
+            user=request.user, recipe_id__in=present).delete()
+        self.on_recipes_removed(request.user, model, entries)
+        return Response({
+            'removed': present, 'skipped': absent, 'not_found': not_found,
+        })
+
+    @action(methods=['POST'], detail=False,
+            permission_classes=[IsAuthenticated])
+    def bulk_favorite(self, request):
+        return self.bulk_post_method_for_action(request, Favorite)
+
+    @bulk_favorite.mapping.delete
+    def bulk_delete_favorite(self, request):
+        return self.bulk_delete_method_for_actions(request, Favorite)
+
+    @action(methods=['POST'], detail=False,
+            permission_classes=[IsAuthenticated])
+    def bulk_shopping_cart(self, request):
+        return self.bulk_post_method_for_action(request, ShoppingCart)
+
+    @bulk_shopping_cart.mapping.delete
+    def bulk_delete_shopping_cart(self, request):
+        return self.bulk_delete_method_for_actions(request, ShoppingCart)
+
+    @action(detail=False)
+    def pantry(self, request):
+        ingredients = request.query_params.get('ingredients', '')
+        serializer = PantrySerializer(data={'ingredients': [
+            value for value in ingredients.split(',') if value]})
+        serializer.is_valid(raise_exception=True)
+        recipe_ids, missing = pantry_index.rank(
+            serializer.validated_data['ingredients'])
+        paginator = LimitPageNumberPagination()
+        page = paginator.paginate_queryset(
+            list(zip(recipe_ids, missing)), request)
+        missing = dict(page)
+        recipes = {
+            recipe.id: recipe
+            for recipe in self.get_queryset().filter(id__in=missing)
+        }
+        serializer = RecipeReadSerializer(
+            [recipes[recipe_id] for recipe_id in missing
+             if recipe_id in recipes],
+            many=True, context=self.get_serializer_context())
+        for recipe in serializer.data:
+            recipe['missing_ingredients'] = missing[recipe['id']]
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=False, permission_classes=[IsAuthenticated])
+    def feed(self, request):
+        paginator = FeedCursorPagination()
+        entries = paginator.paginate_queryset(
+            FeedEntry.objects.filter(user=request.user).only('recipe'),
+            request, view=self)
+        recipe_ids = [entry.recipe_id for entry in entries]
+        recipes = self.get_queryset().in_bulk(recipe_ids)
+        serializer = RecipeReadSerializer(
+            [recipes[recipe_id] for recipe_id in recipe_ids
+             if recipe_id in recipes],
+            many=True, context=self.get_serializer_context())
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=False)
+    def sync(self, request):
+        timestamp = sync.get_timestamp()
+        serializer = SyncSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        updated_since = serializer.validated_data['updated_since']
+        paginator = SyncCursorPagination()
+        recipes = paginator.paginate_queryset(
+            self.get_queryset().filter(modified__gt=updated_since),
+            request, view=self)
+        serializer = RecipeReadSerializer(
+            recipes, many=True, context=self.get_serializer_context())
+        response = paginator.get_paginated_response(serializer.data)
+        if paginator.cursor is None:
+            response.data['deleted'] = list(RecipeTombstone.objects.filter(
+                deleted__gt=updated_since).values_list(
+                'recipe_id', flat=True).distinct())
+        response.data['timestamp'] = timestamp
+        return response
+
+    @action(detail=True)
+    def similar(self, request, pk):
+        recipe = get_object_or_404(Recipe.objects.only('id'), id=pk)
+        serializer = SimilarRecipesSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        recipe_ids = similarity_index.similar(
+            recipe.id, serializer.validated_data['limit'])
+        recipes = Recipe.objects.only(
+            'id', 'name', 'image', 'cooking_time').in_bulk(recipe_ids)
+        serializer = RepresentationSerializer(
+            [recipes[recipe_id] for recipe_id in recipe_ids
+             if recipe_id in recipes],
+            many=True, context={'request': request})
+        return Response(serializer.data)
+
+    @staticmethod
+    def get_shopping_list(user):
+        return ShoppingListItem.objects.filter(
+            user=user).select_related('ingredient').order_by(
+            'ingredient__name')
+
     @action(detail=False, permission_classes=[IsAuthenticated])
+    def shopping_list(self, request):
+        serializer = ShoppingListItemSerializer(
+            self.get_shopping_list(request.user), many=True)
+        return Response(serializer.data)
+
+    @action(detail=False, permission_classes=[IsAuthenticated],
+            renderer_classes=(TextShoppingListRenderer,
+                              PDFShoppingListRenderer,
+                              CSVShoppingListRenderer))
     def download_shopping_cart(self, request):
-        ingredients = CountOfIngredient.objects.filter(
-            recipe__shopping_cart__user=request.user).values(
-            'ingredient__name',
-            'ingredient__measurement_unit').annotate(total=Sum('amount'))
-        shopping_list = 'список:\n'
-        for number, ingredient in enumerate(ingredients, start=1):
-            shopping_list += (
-                f'{number} '
-                f'{ingredient["ingredient__name"]} - '
-                f'{ingredient["total"]} '
-                f'{ingredient["ingredient__measurement_unit"]}\n')
-
-        purchase_list = 'purchase_list.txt'
-        response = HttpResponse(shopping_list, content_type='text/plain')
+        renderer = request.accepted_renderer
+        ingredients_version, _ = catalogs.ingredients.get_version()
+        cache_key = (
+            f'shopping_list:{request.user.id}:'
+            f'{shopping_lists.get_version(request.user)}:'
+            f'{ingredients_version}:{renderer.format}'
+        )
+        document = cache.get(cache_key)
+        if document is None:
+            serializer = ShoppingListItemSerializer(
+                self.get_shopping_list(request.user), many=True)
+            document = renderer.render(serializer.data)
+            cache.set(cache_key, document,
+                      settings.SHOPPING_LIST_CACHE_TIMEOUT)
+
+        content_type = renderer.media_type
+        if renderer.charset:
+            content_type = f'{content_type}; charset={renderer.charset}'
+        response = StreamingHttpResponse(
+            (document[start:start + DOWNLOAD_CHUNK_SIZE]
+             for start in range(0, len(document), DOWNLOAD_CHUNK_SIZE)),
+            content_type=content_type,
+        )
+        purchase_list = f'purchase_list.{renderer.format}'
         response['Content-Disposition'] = (f'attachment;'
                                            f'filename={purchase_list}')
         return response
@@ -104,3 +367,11 @@ class RecipeViewSet(ModelViewSet):
         return self.delete_method_for_actions(
             request=request, pk=pk, model=ShoppingCart
         )
+
+
+class EventTicketView(APIView):
+    permission_classes = (IsAuthenticated,)
+
+    def post(self, request):
+        return Response({'ticket': streams.issue_ticket(request.user.id)},
+                        status=status.HTTP_201_CREATED)
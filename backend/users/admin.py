@@ -5,6 +5,8 @@ from users.models import User
 
 @admin.register(User)
 class UserAdmin(admin.ModelAdmin):
-    list_display = ('id', 'username', 'first_name', 'last_name', 'email')
+    list_display = ('id', 'username', 'first_name', 'last_name', 'email',
+                    'recipes_count')
+    readonly_fields = ('recipes_count',)
     search_fields = ('username', 'email')
     list_filter = ('username', 'email')
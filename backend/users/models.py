@@ -1,6 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db.models import (CASCADE, CharField, EmailField, ForeignKey,
-                              Model, UniqueConstraint)
+                              Model, PositiveIntegerField, UniqueConstraint)
 
 
 class User(AbstractUser):
@@ -8,6 +8,7 @@ class User(AbstractUser):
     username = CharField('Username', max_length=150, unique=True, blank=True)
     first_name = CharField('Name', max_length=150)
     last_name = CharField('Surname', max_length=150)
+    recipes_count = PositiveIntegerField('Recipes count', default=0)
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username', 'first_name', 'last_name']
 
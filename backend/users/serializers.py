@@ -7,6 +7,16 @@ from recipes.models import Recipe
 from .models import Subscribe, User
 
 
+class RecipesLimitSerializer(serializers.Serializer):
+    recipes_limit = serializers.IntegerField(min_value=0, required=False)
+
+
+def get_recipes_limit(request):
+    serializer = RecipesLimitSerializer(data=request.query_params)
+    serializer.is_valid(raise_exception=True)
+    return serializer.validated_data.get('recipes_limit')
+
+
 class CustomUserCreateSerializer(UserCreateSerializer):
     class Meta:
         model = User
@@ -15,6 +25,12 @@ class CustomUserCreateSerializer(UserCreateSerializer):
         )
 
 
+class AuthorSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = User
+        fields = ('id', 'email', 'username', 'first_name', 'last_name')
+
+
 class CustomUserSerializer(UserSerializer):
     is_subscribed = serializers.SerializerMethodField(read_only=True)
 
@@ -26,11 +42,19 @@ class CustomUserSerializer(UserSerializer):
         )
 
     def get_is_subscribed(self, obj):
+        return self.is_subscribed_to(obj.id)
+
+    def is_subscribed_to(self, author_id):
         request = self.context.get('request', )
         if not request or request.user.is_anonymous:
             return False
-        return Subscribe.objects.filter(user=request.user,
-                                        following=obj).exists()
+        if 'subscriptions' not in self.context:
+            self.context['subscriptions'] = set(
+                Subscribe.objects.filter(
+                    user=request.user
+                ).values_list('following_id', flat=True)
+            )
+        return author_id in self.context['subscriptions']
 
 
 class SubscriptionSerializer(serializers.ModelSerializer):
@@ -61,7 +85,6 @@ class RecipeFollowSerializer(serializers.ModelSerializer):
 class SubscriptionListSerializer(serializers.ModelSerializer):
     is_subscribed = serializers.SerializerMethodField(read_only=True)
     recipes = serializers.SerializerMethodField(read_only=True)
-    recipes_count = serializers.SerializerMethodField(read_only=True)
 
     class Meta:
         model = User
@@ -69,6 +92,8 @@ class SubscriptionListSerializer(serializers.ModelSerializer):
                   'last_name', 'is_subscribed', 'recipes', 'recipes_count')
 
     def get_is_subscribed(self, obj):
+        if hasattr(obj, 'is_subscribed'):
+            return obj.is_subscribed
         request = self.context.get('request', )
         if not request or request.user.is_anonymous:
             return False
@@ -80,13 +105,12 @@ class SubscriptionListSerializer(serializers.ModelSerializer):
         if not request or request.user.is_anonymous:
             return False
         context = {'request': request}
-        recipes_limit = request.query_params.get('recipes_limit', )
-        if recipes_limit is not None:
-            recipes = obj.recipes.all()[:int(recipes_limit)]
+        if hasattr(obj, 'page_recipes'):
+            recipes = obj.page_recipes
         else:
-            recipes = obj.recipes.all()
+            recipes_limit = get_recipes_limit(request)
+            if recipes_limit is not None:
+                recipes = obj.recipes.all()[:recipes_limit]
+            else:
+                recipes = obj.recipes.all()
         return RecipeFollowSerializer(recipes, many=True, context=context).data
-
-    @staticmethod
-    def get_recipes_count(obj):
-        return obj.recipes.count()
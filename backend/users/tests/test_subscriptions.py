@@ -0,0 +1,37 @@
+import pytest
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from users.models import Subscribe, User
+
+
+@pytest.fixture
+def subscriber_client(db):
+    users = [
+        User.objects.create_user(
+            email=f'user{index}@example.com', username=f'user{index}',
+            first_name='Имя', last_name='Фамилия', password='password')
+        for index in range(2)
+    ]
+    Subscribe.objects.create(user=users[0], following=users[1])
+    client = APIClient()
+    token = Token.objects.create(user=users[0])
+    client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+    return client
+
+
+@pytest.mark.parametrize('recipes_limit', ('abc', '-1'))
+def test_invalid_recipes_limit_is_rejected(subscriber_client, recipes_limit):
+    response = subscriber_client.get(
+        f'/api/users/subscriptions/?recipes_limit={recipes_limit}')
+
+    assert response.status_code == 400
+    assert 'recipes_limit' in response.json()
+
+
+def test_recipes_limit_zero_returns_no_recipes(subscriber_client):
+    response = subscriber_client.get(
+        '/api/users/subscriptions/?recipes_limit=0')
+
+    assert response.status_code == 200
+    assert response.json()['results'][0]['recipes'] == []
@@ -1,13 +1,17 @@
+from django.db.models import BooleanField, OuterRef, Prefetch, Subquery, Value
 from rest_framework import status
 from rest_framework.generics import ListAPIView, get_object_or_404
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from backend.pagination import LimitPageNumberPagination
+from backend.pagination import (CursorPaginationMixin,
+                                LimitPageNumberPagination)
+from recipes.models import Recipe
 
 from .models import Subscribe, User
-from .serializers import SubscriptionListSerializer, SubscriptionSerializer
+from .serializers import (SubscriptionListSerializer, SubscriptionSerializer,
+                          get_recipes_limit)
 
 
 class FollowView(APIView):
@@ -15,6 +19,7 @@ class FollowView(APIView):
 
     @staticmethod
     def post(request, id):
+        get_recipes_limit(request)
         data = {'user': request.user.id, 'following': id}
         serializer = SubscriptionSerializer(
             data=data, context={'request': request})
@@ -32,15 +37,24 @@ class FollowView(APIView):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class FollowListView(ListAPIView):
+class FollowListView(CursorPaginationMixin, ListAPIView):
     permission_classes = [IsAuthenticated]
     pagination_class = LimitPageNumberPagination
-
-    def get(self, request, **kwargs):
-        user = request.user
-        queryset = User.objects.filter(following__user=user)
-        page = self.paginate_queryset(queryset)
-        serializer = SubscriptionListSerializer(
-            page, many=True, context={'request': request}
-        )
-        return self.get_paginated_response(serializer.data)
+    serializer_class = SubscriptionListSerializer
+
+    def get_queryset(self):
+        recipes = Recipe.objects.all()
+        recipes_limit = get_recipes_limit(self.request)
+        if recipes_limit is not None:
+            recipes = recipes.filter(id__in=Subquery(
+                Recipe.objects.filter(
+                    author=OuterRef('author')
+                ).values('id')[:recipes_limit]
+            ))
+        return User.objects.filter(
+            following__user=self.request.user
+        ).annotate(
+            is_subscribed=Value(True, output_field=BooleanField()),
+        ).prefetch_related(
+            Prefetch('recipes', queryset=recipes, to_attr='page_recipes')
+        ).order_by('-id')